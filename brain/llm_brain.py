@@ -3,19 +3,52 @@ LLM Brain for CommandEcho
 Handles AI response generation using local LLaMA model
 """
 
+import atexit
+import hashlib
 import logging
 import os
-from typing import List, Dict, Optional
+import pickle
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterator, List, Dict, Optional, Set, Tuple
 from pathlib import Path
 
 # Check if llama-cpp-python is available
 try:
-    from llama_cpp import Llama
+    import llama_cpp
+    from llama_cpp import Llama, LlamaRAMCache
     LLAMA_AVAILABLE = True
 except ImportError:
     LLAMA_AVAILABLE = False
     print("⚠️  llama-cpp-python not installed. Install with: pip install llama-cpp-python")
 
+# FAISS backs the semantic response cache (optional)
+try:
+    import faiss
+    import numpy as np
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+# The response cache is written to disk at most every RESPONSE_CACHE_FLUSH_INTERVAL seconds
+RESPONSE_CACHE_FLUSH_INTERVAL = 30.0
+
+# Fallback keyword tables, built once at import
+GREETINGS = frozenset({'hello', 'hi', 'hey'})
+_WORD_RE = re.compile(r"[a-z']+")
+_FALLBACK_RE = re.compile(
+    r"^(?=.*?(?P<wellbeing>how are you|how do you do))"
+    r"|^(?=.*?(?P<thanks>thank you|thanks))"
+    r"|^(?=.*?(?P<weather>weather))"
+    r"|^(?=.*?(?P<time>time))"
+)
+
+# Role labels the model sometimes echoes at the start of a reply
+ROLE_PREFIXES = ("CommandEcho:", "Assistant:", "AI:")
+ROLE_PREFIX_LEN = max(len(prefix) for prefix in ROLE_PREFIXES)
+
 class LLMBrain:
     """AI Brain using local LLaMA model"""
     
@@ -25,10 +58,36 @@ class LLMBrain:
         self.logger = logging.getLogger(__name__)
         self.llm = None
         
+        # KV state of the stable prompt prefix as (prefix_text, prefix_tokens, llama_state)
+        self._prefix_state = None
+        
+        # Tiered context: L1 is the KV-cached prefix plus the recent turns that fit
+        # the history budget, L2 is a compact summary of turns evicted from L1 and
+        # L3 is the long-term store searched through the memory system
+        self.l2_summary = ""
+        self._l2_folded: Set[Tuple[str, str, str]] = set()
+        
+        # Semantic response cache (query embedding -> prior response). Entries are
+        # only valid for the context key they were generated under, are evicted
+        # least recently used first and are persisted in the background
+        self.resp_cache_index = None
+        self.resp_cache_entries: "OrderedDict[int, Tuple[str, str]]" = OrderedDict()
+        self._resp_cache_context = None
+        self._resp_cache_next_id = 0
+        self._resp_cache_lock = threading.Lock()
+        self._resp_cache_dirty = False
+        self._resp_cache_flush = threading.Event()
+        
         if LLAMA_AVAILABLE:
             self._initialize_llm()
         else:
             self.logger.warning("LLaMA not available, using fallback responses")
+        
+        if self.llm:
+            self._init_response_cache()
+            
+            # Evaluate the system prompt once up front so the first turn starts warm
+            self._restore_prefix_state(self._build_system_prompt())
     
     def _initialize_llm(self):
         """Initialize the LLaMA model"""
@@ -41,69 +100,343 @@ class LLMBrain:
         
         try:
             self.logger.info("Loading LLaMA model... This may take a moment.")
-            self.llm = Llama(
-                model_path=str(model_path),
-                n_ctx=self.config.context_length,
-                verbose=False,
-                n_threads=os.cpu_count() // 2  # Use half of available CPU cores
-            )
+            gpu_layers = self._gpu_layers()
+            try:
+                self.llm = self._load_llama(model_path, gpu_layers)
+            except Exception as e:
+                if not gpu_layers:
+                    raise
+                self.logger.warning(f"GPU offload failed ({e}), loading on CPU")
+                self.llm = self._load_llama(model_path, 0)
+            
+            # Keep KV states of recent prompts so shared prefixes are not re-evaluated
+            self.llm.set_cache(LlamaRAMCache(capacity_bytes=self.config.prompt_cache_mb << 20))
             self.logger.info("LLaMA model loaded successfully!")
             
         except Exception as e:
             self.logger.error(f"Failed to load LLaMA model: {e}")
             self.llm = None
     
+    def _gpu_layers(self) -> int:
+        """Number of layers to offload, or 0 if this llama.cpp build has no GPU backend"""
+        if not self.config.n_gpu_layers:
+            return 0
+        
+        try:
+            supported = llama_cpp.llama_supports_gpu_offload()
+        except AttributeError:
+            supported = False
+        
+        if not supported:
+            self.logger.info("llama.cpp built without GPU support, running on CPU")
+            return 0
+        return self.config.n_gpu_layers
+    
+    def _load_llama(self, model_path: Path, n_gpu_layers: int):
+        """Construct the Llama model with the configured runtime knobs"""
+        n_threads = self.config.n_threads or min(os.cpu_count() or 4, 16)
+        gpu_kwargs = {}
+        if n_gpu_layers:
+            gpu_kwargs = {
+                'n_gpu_layers': n_gpu_layers,
+                'main_gpu': self.config.main_gpu,
+                'split_mode': llama_cpp.LLAMA_SPLIT_MODE_LAYER
+            }
+        
+        return Llama(
+            model_path=str(model_path),
+            n_ctx=self.config.context_length,
+            verbose=False,
+            n_threads=n_threads,
+            n_threads_batch=n_threads,
+            n_batch=self.config.n_batch,
+            n_ubatch=self.config.n_ubatch,
+            use_mlock=self.config.use_mlock,
+            use_mmap=self.config.use_mmap,
+            flash_attn=self.config.flash_attn,
+            offload_kqv=self.config.offload_kqv,
+            **gpu_kwargs
+        )
+    
+    def _init_response_cache(self):
+        """Initialize FAISS index used as a semantic response cache"""
+        if not FAISS_AVAILABLE or not self.memory.embedding_model:
+            return
+        
+        if not self._load_response_cache():
+            try:
+                dimension = self.memory.embedding_model.encode(["test"]).shape[1]
+                self.resp_cache_index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+            except Exception as e:
+                self.logger.error(f"Failed to create response cache: {e}")
+                self.resp_cache_index = None
+                return
+        
+        threading.Thread(target=self._response_cache_flush_worker, daemon=True).start()
+        atexit.register(self.flush_response_cache)
+    
+    def _load_response_cache(self) -> bool:
+        """Load the persisted response cache if it was built under the current context"""
+        index_path, entries_path = self._response_cache_paths()
+        if not (index_path.exists() and entries_path.exists()):
+            return False
+        
+        try:
+            with open(entries_path, 'rb') as f:
+                state = pickle.load(f)
+            
+            # Older caches (a plain list) carry no context key, so they are discarded
+            if not isinstance(state, dict) or state.get('context') != self._response_context_key():
+                self.logger.info("Discarding response cache built under a different context")
+                return False
+            
+            self.resp_cache_index = faiss.read_index(str(index_path))
+            self.resp_cache_entries = state['entries']
+            self._resp_cache_next_id = state['next_id']
+            self._resp_cache_context = state['context']
+            self.logger.info(f"Loaded response cache with {len(self.resp_cache_entries)} entries")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error loading response cache: {e}")
+            self.resp_cache_index = None
+            self.resp_cache_entries = OrderedDict()
+            return False
+    
+    def _response_cache_paths(self) -> Tuple[Path, Path]:
+        """Get on-disk locations of the response cache"""
+        cache_dir = Path(self.memory.config.vector_db_path)
+        return cache_dir / "response_cache.faiss", cache_dir / "response_cache.pkl"
+    
+    def _response_context_key(self) -> str:
+        """Hash of everything a cached answer depends on besides the question"""
+        # The system prompt carries the user's preferences; the memory revision
+        # changes whenever a memory (which retrieval could surface) is stored
+        context = f"{self._build_system_prompt()}\0{self.memory.memory_revision}"
+        return hashlib.sha1(context.encode('utf-8')).hexdigest()
+    
+    def _sync_response_cache_context(self):
+        """Drop cached responses generated under an older context (call with the lock held)"""
+        context = self._response_context_key()
+        if context == self._resp_cache_context:
+            return
+        
+        if self.resp_cache_entries:
+            self.logger.debug("Context changed, clearing response cache")
+            self.resp_cache_index.reset()
+            self.resp_cache_entries.clear()
+            self._resp_cache_dirty = True
+        self._resp_cache_context = context
+    
+    def _embed_query(self, user_input: str):
+        """Embed user input for the response cache, or None if unavailable"""
+        if self.resp_cache_index is None:
+            return None
+        
+        try:
+            return self.memory.embedding_model.encode(
+                [user_input],
+                normalize_embeddings=True,
+                convert_to_numpy=True
+            )
+        except Exception as e:
+            self.logger.error(f"Error embedding query for response cache: {e}")
+            return None
+    
+    def _lookup_cached_response(self, embedding) -> Optional[str]:
+        """Return a cached response for a semantically identical query"""
+        if embedding is None:
+            return None
+        
+        with self._resp_cache_lock:
+            self._sync_response_cache_context()
+            if self.resp_cache_index.ntotal == 0:
+                return None
+            
+            scores, ids = self.resp_cache_index.search(embedding, 1)
+            entry_id = int(ids[0][0])
+            if entry_id != -1 and scores[0][0] >= self.config.response_cache_threshold:
+                self.resp_cache_entries.move_to_end(entry_id)  # Most recently used
+                query, response = self.resp_cache_entries[entry_id]
+                self.logger.debug(f"Response cache hit ({scores[0][0]:.3f}) for: {query}")
+                return response
+        
+        return None
+    
+    def _cache_response(self, embedding, user_input: str, response_text: str):
+        """Add a generated response to the cache; it is persisted in the background"""
+        if embedding is None or not response_text:
+            return
+        
+        try:
+            with self._resp_cache_lock:
+                self._sync_response_cache_context()
+                
+                entry_id = self._resp_cache_next_id
+                self._resp_cache_next_id += 1
+                self.resp_cache_index.add_with_ids(embedding, np.array([entry_id], dtype='int64'))
+                self.resp_cache_entries[entry_id] = (user_input, response_text)
+                
+                # Evict the least recently used entries beyond the cap
+                while len(self.resp_cache_entries) > self.config.response_cache_size:
+                    evicted_id, _ = self.resp_cache_entries.popitem(last=False)
+                    self.resp_cache_index.remove_ids(np.array([evicted_id], dtype='int64'))
+                
+                self._resp_cache_dirty = True
+                
+        except Exception as e:
+            self.logger.error(f"Error updating response cache: {e}")
+    
+    def _response_cache_flush_worker(self):
+        """Worker thread that periodically persists the response cache"""
+        while True:
+            self._resp_cache_flush.wait(RESPONSE_CACHE_FLUSH_INTERVAL)
+            self._resp_cache_flush.clear()
+            self.flush_response_cache()
+    
+    def flush_response_cache(self):
+        """Write the response cache to disk if it changed since the last write"""
+        with self._resp_cache_lock:
+            if not self._resp_cache_dirty or self.resp_cache_index is None:
+                return
+            
+            try:
+                index_path, entries_path = self._response_cache_paths()
+                faiss.write_index(self.resp_cache_index, str(index_path))
+                with open(entries_path, 'wb') as f:
+                    pickle.dump({
+                        'context': self._resp_cache_context,
+                        'next_id': self._resp_cache_next_id,
+                        'entries': self.resp_cache_entries
+                    }, f)
+                self._resp_cache_dirty = False
+                
+            except Exception as e:
+                self.logger.error(f"Error saving response cache: {e}")
+    
     def generate_response(self, user_input: str) -> str:
         """Generate AI response to user input"""
+        return self._clean_response("".join(self.generate_response_stream(user_input)).strip())
+    
+    def generate_response_stream(self, user_input: str) -> Iterator[str]:
+        """Generate AI response to user input, yielding text as it is decoded"""
         if not self.llm:
-            return self._fallback_response(user_input)
+            yield self._fallback_response(user_input)
+            return
         
+        emitted = False
         try:
             # Get conversation context
-            context = self._build_context(user_input)
+            prefix, suffix, standalone = self._build_context(user_input)
+            
+            # Serve semantically identical questions from the cache, but only when
+            # no earlier turns could change what the question means
+            query_embedding = None
+            if standalone:
+                query_embedding = self._embed_query(user_input)
+                cached_response = self._lookup_cached_response(query_embedding)
+                if cached_response is not None:
+                    yield cached_response
+                    return
+            
+            # Reuse the KV cache and tokens of the stable prefix so only the suffix
+            # is tokenized and prefilled
+            prefix_tokens = self._restore_prefix_state(prefix)
+            if prefix_tokens is not None:
+                prompt = prefix_tokens + self.llm.tokenize(suffix.encode('utf-8'), add_bos=False)
+            else:
+                prompt = prefix + suffix
             
             # Generate response
-            response = self.llm(
-                context,
+            stream = self.llm(
+                prompt,
                 max_tokens=self.config.max_tokens,
                 temperature=self.config.temperature,
                 top_p=self.config.top_p,
                 stop=["User:", "Human:", "\n\n"],
-                echo=False
+                echo=False,
+                stream=True
             )
             
-            # Extract the response text
-            response_text = response['choices'][0]['text'].strip()
+            # Hold back the first characters until any echoed role label can be stripped
+            parts = []
+            head = ""
+            for chunk in stream:
+                text = chunk['choices'][0]['text']
+                parts.append(text)
+                
+                if emitted:
+                    yield text
+                    continue
+                
+                head = (head + text).lstrip()
+                if len(head) >= ROLE_PREFIX_LEN:
+                    head = self._strip_role_prefix(head)
+                    emitted = True
+                    if head:
+                        yield head
+            
+            if not emitted:
+                head = self._strip_role_prefix(head)
+                emitted = True
+                if head:
+                    yield head
             
-            # Clean up the response
-            response_text = self._clean_response(response_text)
+            # Clean up the full response
+            response_text = self._clean_response("".join(parts).strip())
             
-            return response_text
+            # Remember the response for future similar questions
+            self._cache_response(query_embedding, user_input, response_text)
             
         except Exception as e:
             self.logger.error(f"Error generating LLM response: {e}")
-            return self._fallback_response(user_input)
+            if not emitted:
+                yield self._fallback_response(user_input)
     
-    def _build_context(self, user_input: str) -> str:
-        """Build conversation context for the LLM"""
-        # Get user preferences and relevant memories
+    def _restore_prefix_state(self, prefix: str) -> Optional[List[int]]:
+        """Load the saved KV state for the prompt prefix, evaluating it only when it changed"""
+        try:
+            if self._prefix_state is not None and self._prefix_state[0] == prefix:
+                self.llm.load_state(self._prefix_state[2])
+                return self._prefix_state[1]
+            
+            tokens = self.llm.tokenize(prefix.encode('utf-8'), add_bos=True)
+            self.llm.reset()
+            self.llm.eval(tokens)
+            self._prefix_state = (prefix, tokens, self.llm.save_state())
+            return tokens
+            
+        except Exception as e:
+            # The full prompt is still evaluated by the completion call
+            self.logger.error(f"Error restoring prompt prefix state: {e}")
+            self._prefix_state = None
+            return None
+    
+    def _build_system_prompt(self) -> str:
+        """Build the stable system prompt that prefixes every context"""
         user_name = self.memory.get_user_preference('name', 'User')
-        relevant_memories = self.memory.search_memories(user_input, limit=3)
-        
-        # Get recent conversation history
-        conversation_history = self.memory.get_recent_conversation(limit=5)
         
-        # Build the context
-        context_parts = []
-        
-        # System prompt
-        context_parts.append(
+        return (
             "You are CommandEcho, an intelligent AI assistant similar to Jarvis from Iron Man. "
             "You are helpful, conversational, and have a slightly sophisticated personality. "
             "You can control computer systems and remember information about the user. "
             f"The user's name is {user_name}. "
             "Keep responses concise but friendly."
         )
+    
+    def _build_context(self, user_input: str) -> Tuple[str, str, bool]:
+        """Build conversation context for the LLM as (stable prefix, variable suffix, standalone)"""
+        # Get relevant memories
+        relevant_memories = self.memory.search_memories(user_input, limit=3)
+        
+        # Get recent conversation history, folding what no longer fits into L2
+        conversation_history = self._select_recent_turns(
+            self.memory.get_recent_conversation(limit=self.memory.config.max_short_term_memory)
+        )
+        
+        # Build the variable part of the context (leading "" keeps the
+        # newline that separates it from the system prompt)
+        context_parts = [""]
         
         # Add relevant memories if any
         if relevant_memories:
@@ -111,27 +444,94 @@ class LLMBrain:
             for memory in relevant_memories:
                 context_parts.append(f"- {memory}")
         
+        # Add summary of older turns
+        if self.l2_summary:
+            context_parts.append(f"\nEarlier in this conversation: {self.l2_summary}")
+        
         # Add conversation history
         if conversation_history:
             context_parts.append("\nRecent conversation:")
             for entry in conversation_history:
-                role = entry['role'].title()
-                content = entry['content']
-                context_parts.append(f"{role}: {content}")
+                context_parts.append(self._format_turn(entry))
         
         # Add current user input
         context_parts.append(f"\nUser: {user_input}")
         context_parts.append("CommandEcho:")
         
-        return "\n".join(context_parts)
+        # Without history or summary the reply depends on the question alone
+        standalone = not conversation_history and not self.l2_summary
+        
+        return self._build_system_prompt(), "\n".join(context_parts), standalone
+    
+    def _format_turn(self, entry: Dict) -> str:
+        """Format a conversation entry as a context line"""
+        return f"{entry['role'].title()}: {entry['content']}"
+    
+    def _count_tokens(self, text: str) -> int:
+        """Count model tokens in text"""
+        return len(self.llm.tokenize(text.encode('utf-8'), add_bos=False))
+    
+    def _select_recent_turns(self, history: List[Dict]) -> List[Dict]:
+        """Keep the newest turns that fit the history budget and compact the rest into L2"""
+        kept = []
+        used_tokens = 0
+        for entry in reversed(history):
+            cost = self._count_tokens(self._format_turn(entry))
+            if kept and used_tokens + cost > self.config.history_token_budget:
+                break
+            kept.append(entry)
+            used_tokens += cost
+        kept.reverse()
+        
+        evicted = history[:len(history) - len(kept)]
+        evicted_keys = [(e['role'], e['content'], str(e['timestamp'])) for e in evicted]
+        new_turns = [e for e, key in zip(evicted, evicted_keys) if key not in self._l2_folded]
+        if new_turns and self._compact_into_summary(new_turns):
+            # Only remember keys still inside the fetched window
+            self._l2_folded = set(evicted_keys)
+        
+        return kept
+    
+    def _compact_into_summary(self, entries: List[Dict]) -> bool:
+        """Fold evicted turns into the L2 summary with a single LLM call"""
+        prompt_parts = [
+            "Summarize the conversation below in a few sentences, keeping any facts "
+            "about the user and open requests."
+        ]
+        if self.l2_summary:
+            prompt_parts.append(f"Previous summary: {self.l2_summary}")
+        prompt_parts.extend(self._format_turn(entry) for entry in entries)
+        prompt_parts.append("Summary:")
+        prompt = "\n".join(prompt_parts)
+        
+        try:
+            response = self.llm(
+                prompt,
+                max_tokens=self.config.summary_max_tokens,
+                temperature=0.2,
+                stop=["User:", "\n\n"],
+                echo=False
+            )
+            summary = response['choices'][0]['text'].strip()
+            if summary:
+                self.l2_summary = summary
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error compacting conversation history: {e}")
+            return False
+    
+    def _strip_role_prefix(self, response: str) -> str:
+        """Remove role labels echoed at the start of the response"""
+        for prefix in ROLE_PREFIXES:
+            if response.startswith(prefix):
+                response = response[len(prefix):].lstrip()
+        return response
     
     def _clean_response(self, response: str) -> str:
         """Clean up the LLM response"""
         # Remove any unwanted prefixes
-        prefixes_to_remove = ["CommandEcho:", "Assistant:", "AI:"]
-        for prefix in prefixes_to_remove:
-            if response.startswith(prefix):
-                response = response[len(prefix):].strip()
+        response = self._strip_role_prefix(response)
         
         # Remove any trailing incomplete sentences
         sentences = response.split('.')
@@ -145,20 +545,22 @@ class LLMBrain:
         user_input_lower = user_input.lower()
         
         # Simple pattern matching for common queries
-        if any(greeting in user_input_lower for greeting in ['hello', 'hi', 'hey']):
+        if GREETINGS.intersection(_WORD_RE.findall(user_input_lower)):
             return "Hello! I'm CommandEcho, your AI assistant. How can I help you today?"
         
-        elif any(question in user_input_lower for question in ['how are you', 'how do you do']):
+        match = _FALLBACK_RE.search(user_input_lower)
+        topic = match.lastgroup if match else None
+        
+        if topic == 'wellbeing':
             return "I'm functioning well, thank you! Ready to assist you with any tasks."
         
-        elif any(thanks in user_input_lower for thanks in ['thank you', 'thanks']):
+        elif topic == 'thanks':
             return "You're welcome! I'm here whenever you need assistance."
         
-        elif 'weather' in user_input_lower:
+        elif topic == 'weather':
             return "I don't have access to current weather data, but you can check your local weather app or website."
         
-        elif 'time' in user_input_lower:
-            from datetime import datetime
+        elif topic == 'time':
             current_time = datetime.now().strftime("%I:%M %p")
             return f"The current time is {current_time}."
         
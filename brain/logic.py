@@ -2,63 +2,100 @@
 
 import datetime
 import os
+import re
 from system.control import open_application
 from brain.ai_response import get_ai_response
 from brain.memory import remember, recall
 from system.monitor import system_status
 from system.control import open_application, open_folder
 
+def handle_open(command):
+    if "folder" in command or "directory" in command:
+        return open_folder(command)
+    else:
+        app_name = command.replace("open", "").strip()
+        return open_application(app_name)
+
+def handle_time(command):
+    now = datetime.datetime.now().strftime("%H:%M")
+    return f"The current time is {now}."
+
+def handle_date(command):
+    today = datetime.date.today().strftime("%B %d, %Y")
+    return f"Today's date is {today}."
+
+def handle_hello(command):
+    return "Hello Manish, how can I assist you today?"
+
+def handle_joke(command):
+    return "Why don't programmers like nature? Too many bugs."
+
+def handle_exit(command):
+    return "exit"
+
+_REMEMBER_RE = re.compile(r"remember that\s+(.+?)\s+is\s+(.+)", re.I)
+_RECALL_RE = re.compile(r"do you remember\s+(.+)", re.I)
+
+def handle_remember(command):
+    m = _REMEMBER_RE.search(command)
+    if not m:
+        return "I didn't catch what to remember."
+    key, value = m.group(1).strip(), m.group(2).strip()
+    remember(key, value)
+    return f"I will remember that {key} is {value}."
+
+def handle_recall(command):
+    m = _RECALL_RE.search(command)
+    if not m:
+        return "I couldn't understand what you asked me to recall."
+    key = m.group(1).strip()
+    value = recall(key)
+    return f"Yes, {key} is {value}." if value else "I don't remember that yet."
+
+def handle_status(command):
+    return system_status()
+
+def handle_diagnose(command):
+    return system_status(verbose=True)
+
+# Command keywords in priority order; each branch is an anchored lookahead so
+# the first matching entry wins regardless of where it appears in the text
+_COMMANDS = [
+    ("open", r"open"),
+    ("time", r"time"),
+    ("date", r"date"),
+    ("hello", r"hello"),
+    ("joke", r"joke"),
+    ("exit", r"exit|quit"),
+    ("remember", r"remember that"),
+    ("recall", r"do you remember"),
+    ("status", r"system status|how is my pc"),
+    ("diagnose", r"diagnose system|full system report"),
+]
+
+_CMD_RE = re.compile("|".join(
+    rf"^(?=.*?\b(?P<{name}>{pattern})\b)" for name, pattern in _COMMANDS
+))
+
+_HANDLERS = {
+    "open": handle_open,
+    "time": handle_time,
+    "date": handle_date,
+    "hello": handle_hello,
+    "joke": handle_joke,
+    "exit": handle_exit,
+    "remember": handle_remember,
+    "recall": handle_recall,
+    "status": handle_status,
+    "diagnose": handle_diagnose,
+}
+
 def process_command(text):
     command = text.lower()
     command = command.replace("’", "'")  # Normalize smart quotes
 
-    if "open" in command:
-        if "folder" in command or "directory" in command:
-            return open_folder(command)
-        else:
-            app_name = command.replace("open", "").strip()
-            return open_application(app_name)
-
-    elif "time" in command:
-        now = datetime.datetime.now().strftime("%H:%M")
-        return f"The current time is {now}."
-
-    elif "date" in command:
-        today = datetime.date.today().strftime("%B %d, %Y")
-        return f"Today's date is {today}."
-
-    elif "hello" in command:
-        return "Hello Manish, how can I assist you today?"
-
-    elif "joke" in command:
-        return "Why don't programmers like nature? Too many bugs."
-
-    elif "exit" in command or "quit" in command:
-        return "exit"
-
-    elif "remember that" in command:
-        try:
-            _, memory = command.split("remember that", 1)
-            key = memory.strip().split(" is ")[0].strip()
-            value = memory.strip().split(" is ")[1].strip()
-            remember(key, value)
-            return f"I will remember that {key} is {value}."
-        except:
-            return "I didn't catch what to remember."
-
-    elif "do you remember" in command:
-        try:
-            key = command.split("do you remember", 1)[1].strip()
-            value = recall(key)
-            return f"Yes, {key} is {value}." if value else "I don't remember that yet."
-        except:
-            return "I couldn't understand what you asked me to recall."
-
-    elif "system status" in command or "how is my pc" in command:
-        return system_status()
-
-    elif "diagnose system" in command or "full system report" in command:
-        return system_status(verbose=True)
+    m = _CMD_RE.search(command)
+    if m:
+        return _HANDLERS[m.lastgroup](command)
 
-    else:
-        return get_ai_response(command)  # Fallback to smart AI    
+    return get_ai_response(command)  # Fallback to smart AI
@@ -6,10 +6,25 @@ from datetime import datetime
 
 DB_PATH = os.path.join("data", "memory.db")
 
+# WAL journaling avoids a full fsync on every autocommitted write
+_PRAGMAS = '''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+'''
+
+_conn = None
+
+def _get_conn():
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+        _conn.executescript(_PRAGMAS)
+    return _conn
+
 def init_memory():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
+    _get_conn().execute('''
         CREATE TABLE IF NOT EXISTS memory (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT,
@@ -17,23 +32,13 @@ def init_memory():
             value TEXT
         )
     ''')
-    conn.commit()
-    conn.close()
 
 def remember(key, value):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
+    _get_conn().execute('''
         INSERT OR REPLACE INTO memory (timestamp, key, value)
         VALUES (?, ?, ?)
     ''', (datetime.now().isoformat(), key.lower(), value))
-    conn.commit()
-    conn.close()
 
 def recall(key):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('SELECT value FROM memory WHERE key = ?', (key.lower(),))
-    result = cursor.fetchone()
-    conn.close()
+    result = _get_conn().execute('SELECT value FROM memory WHERE key = ?', (key.lower(),)).fetchone()
     return result[0] if result else None
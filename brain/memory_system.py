@@ -3,12 +3,19 @@ Memory System for CommandEcho
 Handles short-term and long-term memory with vector embeddings
 """
 
+import atexit
 import logging
 import sqlite3
 import json
 import pickle
+import queue
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
 # Check for sentence transformers
@@ -28,6 +35,39 @@ except ImportError:
     FAISS_AVAILABLE = False
     print("⚠️  faiss-cpu not installed. Install with: pip install faiss-cpu")
 
+# WAL journaling and relaxed syncing keep per-write fsync cost low
+SQLITE_PRAGMAS = '''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+'''
+
+# Conversation messages are written by a background thread, committing up
+# to this many queued messages at a time
+CONVERSATION_WRITE_BATCH = 64
+
+# Embedding requests are coalesced into batches of up to this many texts,
+# waiting this long (seconds) for concurrent requests to arrive
+ENCODE_BATCH_SIZE = 32
+ENCODE_BATCH_WINDOW = 0.01
+
+# The vector index is written to disk at most every INDEX_FLUSH_INTERVAL
+# seconds, or sooner once INDEX_FLUSH_BATCH inserts are pending
+INDEX_FLUSH_INTERVAL = 30.0
+INDEX_FLUSH_BATCH = 64
+
+# HNSW graph parameters for the memory vector index
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 64
+HNSW_EF_SEARCH = 32
+
+# Above this many memories the HNSW index is rebuilt as IVF-PQ
+IVFPQ_THRESHOLD = 50000
+IVFPQ_NLIST = 256
+IVFPQ_M = 16
+IVFPQ_NPROBE = 16
+
 class MemorySystem:
     """Handles both short-term and long-term memory"""
     
@@ -42,21 +82,51 @@ class MemorySystem:
         # Initialize databases
         self._init_sqlite_db()
         
+        # Conversation history is written off the response path
+        self._write_queue = queue.Queue()
+        self._writer_thread = threading.Thread(target=self._conversation_writer, daemon=True)
+        self._writer_thread.start()
+        atexit.register(self.flush_conversations)
+        
+        # User preferences change rarely, so lookups are served from memory
+        self._pref_cache: Dict[str, Optional[str]] = {}
+        
+        # Id of the newest stored memory; memories are only ever added, so this
+        # changes exactly when what the assistant remembers changes
+        self.memory_revision = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM memories").fetchone()[0]
+        
         # Initialize embedding model
         self.embedding_model = None
         self.vector_index = None
         
+        # Vector index writes are batched and flushed in the background
+        self._index_lock = threading.Lock()
+        self._dirty_count = 0
+        self._flush_requested = threading.Event()
+        
         if EMBEDDINGS_AVAILABLE:
             self._init_embedding_model()
         
-        # Short-term memory (conversation within session)
-        self.short_term_memory: List[Dict[str, Any]] = []
+        if self.vector_index is not None:
+            self._flush_thread = threading.Thread(target=self._flush_worker, daemon=True)
+            self._flush_thread.start()
+            atexit.register(self.flush_vector_index)
+        
+        # Short-term memory (most recent turns, seeded from the previous session)
+        max_turns = self.config.max_short_term_memory
+        self.short_term_memory = deque(self._load_recent_conversation(max_turns), maxlen=max_turns)
         
         self.logger.info("Memory system initialized")
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the memory database"""
+        conn = sqlite3.connect(self.config.memory_db_path, check_same_thread=False)
+        conn.executescript(SQLITE_PRAGMAS)
+        return conn
+    
     def _init_sqlite_db(self):
         """Initialize SQLite database for structured memory"""
-        self.conn = sqlite3.connect(self.config.memory_db_path, check_same_thread=False)
+        self.conn = self._connect()
         self.conn.execute('''
             CREATE TABLE IF NOT EXISTS memories (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -84,35 +154,124 @@ class MemorySystem:
             )
         ''')
         
+        # Indexes for the timestamp-ordered queries
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_conversations_timestamp ON conversations(timestamp DESC)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_memories_timestamp ON memories(timestamp DESC)"
+        )
+        
         self.conn.commit()
+        
+        # Full-text mirror of memories for the text search fallback
+        self.fts_available = self._init_fts_index()
+    
+    def _init_fts_index(self) -> bool:
+        """Create the FTS5 index mirroring the memories table"""
+        try:
+            exists = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'memories_fts'"
+            ).fetchone()
+            
+            self.conn.executescript('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+                    content, content='memories', content_rowid='id', tokenize='porter unicode61'
+                );
+                CREATE TRIGGER IF NOT EXISTS memories_ai AFTER INSERT ON memories BEGIN
+                    INSERT INTO memories_fts(rowid, content) VALUES (new.id, new.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS memories_ad AFTER DELETE ON memories BEGIN
+                    INSERT INTO memories_fts(memories_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS memories_au AFTER UPDATE ON memories BEGIN
+                    INSERT INTO memories_fts(memories_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                    INSERT INTO memories_fts(rowid, content) VALUES (new.id, new.content);
+                END;
+            ''')
+            
+            if not exists:
+                # Index memories stored before the FTS table existed
+                self.conn.execute("INSERT INTO memories_fts(memories_fts) VALUES ('rebuild')")
+                self.conn.commit()
+            
+            return True
+            
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"SQLite FTS5 not available, using LIKE search: {e}")
+            return False
     
     def _init_embedding_model(self):
         """Initialize sentence transformer model for embeddings"""
         try:
             self.logger.info("Loading embedding model...")
-            self.embedding_model = SentenceTransformer(self.config.embedding_model)
+            self.embedding_model = self._load_embedding_model()
             
             # Initialize or load FAISS index
             if FAISS_AVAILABLE:
                 self._init_vector_index()
             
+            # Start batching encoder
+            self._pending: List[Tuple[str, Future]] = []
+            self._pending_cond = threading.Condition()
+            self._enc_thread = threading.Thread(target=self._encode_worker, daemon=True)
+            self._enc_thread.start()
+            
             self.logger.info("Embedding model loaded successfully")
             
         except Exception as e:
             self.logger.error(f"Failed to load embedding model: {e}")
             self.embedding_model = None
     
+    def _load_embedding_model(self):
+        """Load the embedding model, preferring the int8-quantized ONNX backend"""
+        if self.config.embedding_backend == "onnx":
+            try:
+                model = self._load_onnx_embedding_model()
+                self.logger.info("Using int8-quantized ONNX embedding model")
+                return model
+            except Exception as e:
+                self.logger.warning(f"ONNX embedding backend unavailable, using PyTorch: {e}")
+        
+        return SentenceTransformer(self.config.embedding_model)
+    
+    def _load_onnx_embedding_model(self):
+        """Load a dynamically int8-quantized ONNX export of the embedding model"""
+        quantized_file = f"onnx/model_qint8_{self.config.embedding_quantization}.onnx"
+        model_kwargs = {"provider": "CPUExecutionProvider", "file_name": quantized_file}
+        export_dir = Path(self.config.vector_db_path) / "onnx_embedding_model"
+        
+        # Quantized export published alongside the model
+        try:
+            return SentenceTransformer(self.config.embedding_model, backend="onnx", model_kwargs=model_kwargs)
+        except Exception as e:
+            self.logger.debug(f"No published quantized ONNX model: {e}")
+        
+        # Export and quantize once, then reuse the cached copy
+        if not (export_dir / quantized_file).exists():
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+            
+            self.logger.info("Exporting embedding model to quantized ONNX (one-time)...")
+            onnx_model = SentenceTransformer(
+                self.config.embedding_model,
+                backend="onnx",
+                model_kwargs={"provider": "CPUExecutionProvider"}
+            )
+            onnx_model.save_pretrained(str(export_dir))
+            export_dynamic_quantized_onnx_model(onnx_model, self.config.embedding_quantization, str(export_dir))
+        
+        return SentenceTransformer(str(export_dir), backend="onnx", model_kwargs=model_kwargs)
+    
     def _init_vector_index(self):
         """Initialize FAISS vector index"""
         index_path = Path(self.config.vector_db_path) / "memory_index.faiss"
-        metadata_path = Path(self.config.vector_db_path) / "memory_metadata.pkl"
         
-        if index_path.exists() and metadata_path.exists():
+        if index_path.exists():
             # Load existing index
             try:
                 self.vector_index = faiss.read_index(str(index_path))
-                with open(metadata_path, 'rb') as f:
-                    self.vector_metadata = pickle.load(f)
+                if not isinstance(self.vector_index, faiss.IndexIDMap2):
+                    self._migrate_legacy_index()
                 self.logger.info("Loaded existing vector index")
             except Exception as e:
                 self.logger.error(f"Error loading vector index: {e}")
@@ -126,34 +285,162 @@ class MemorySystem:
         sample_embedding = self.embedding_model.encode(["test"])
         dimension = sample_embedding.shape[1]
         
-        # Create FAISS index
-        self.vector_index = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
-        self.vector_metadata = []
+        # HNSW graph for sublinear search over fp16-quantized vectors (half the
+        # memory of fp32 and no training pass); ids map to SQLite memory ids
+        hnsw = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_fp16, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        hnsw.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        hnsw.hnsw.efSearch = HNSW_EF_SEARCH
+        self.vector_index = faiss.IndexIDMap2(hnsw)
         
         self.logger.info(f"Created new vector index with dimension {dimension}")
     
+    def _migrate_legacy_index(self):
+        """Convert a flat index with a pickled metadata list to an id-mapped index"""
+        metadata_path = Path(self.config.vector_db_path) / "memory_metadata.pkl"
+        legacy_index = self.vector_index
+        
+        with open(metadata_path, 'rb') as f:
+            legacy_metadata = pickle.load(f)
+        
+        self._create_new_vector_index()
+        if legacy_index.ntotal:
+            vectors = legacy_index.reconstruct_n(0, legacy_index.ntotal)
+            ids = np.array([entry['id'] for entry in legacy_metadata], dtype='int64')
+            self.vector_index.add_with_ids(vectors, ids)
+        
+        self._save_vector_index()
+        self.logger.info(f"Migrated {legacy_index.ntotal} memories to id-mapped vector index")
+    
+    def _export_vectors(self) -> Tuple[Any, Any]:
+        """Get (ids, vectors) of the id-mapped vector index in insertion order"""
+        ids = faiss.vector_to_array(self.vector_index.id_map)
+        vectors = faiss.downcast_index(self.vector_index.index).reconstruct_n(0, len(ids))
+        return ids, vectors
+    
+    def _maybe_upgrade_index(self):
+        """Rebuild a large HNSW index as IVF-PQ, training on the stored vectors"""
+        with self._index_lock:
+            if self.vector_index.ntotal < IVFPQ_THRESHOLD:
+                return
+            if not isinstance(faiss.downcast_index(self.vector_index.index), faiss.IndexHNSW):
+                return
+            ids, vectors = self._export_vectors()
+        
+        dimension = vectors.shape[1]
+        if dimension % IVFPQ_M:
+            return
+        
+        # Train outside the lock so searches keep working during the rebuild
+        self.logger.info(f"Rebuilding vector index as IVF-PQ for {len(ids)} memories...")
+        quantizer = faiss.IndexFlatIP(dimension)
+        ivfpq = faiss.IndexIVFPQ(quantizer, dimension, IVFPQ_NLIST, IVFPQ_M, 8, faiss.METRIC_INNER_PRODUCT)
+        ivfpq.train(vectors)
+        ivfpq.nprobe = IVFPQ_NPROBE
+        new_index = faiss.IndexIDMap2(ivfpq)
+        new_index.add_with_ids(vectors, ids)
+        
+        with self._index_lock:
+            # Carry over memories stored while training
+            all_ids, all_vectors = self._export_vectors()
+            if len(all_ids) > len(ids):
+                new_index.add_with_ids(all_vectors[len(ids):], all_ids[len(ids):])
+            self.vector_index = new_index
+            self._dirty_count += 1
+        
+        self.logger.info("Vector index rebuilt as IVF-PQ")
+    
+    def _tune_search(self, limit: int):
+        """Adjust search breadth of the underlying index to the requested result count"""
+        index = faiss.downcast_index(self.vector_index.index)
+        if isinstance(index, faiss.IndexHNSW):
+            index.hnsw.efSearch = max(HNSW_EF_SEARCH, 2 * limit)
+    
+    def _embed_async(self, text: str) -> Future:
+        """Queue text for embedding; the future resolves to a normalized (1, d) array"""
+        future = Future()
+        with self._pending_cond:
+            self._pending.append((text, future))
+            self._pending_cond.notify()
+        return future
+    
+    def _encode_worker(self):
+        """Worker thread that encodes queued texts in batches"""
+        while True:
+            with self._pending_cond:
+                while not self._pending:
+                    self._pending_cond.wait()
+            
+            # Give concurrent requests a moment to join the batch
+            time.sleep(ENCODE_BATCH_WINDOW)
+            
+            with self._pending_cond:
+                batch = self._pending[:ENCODE_BATCH_SIZE]
+                del self._pending[:ENCODE_BATCH_SIZE]
+            
+            try:
+                embeddings = self.embedding_model.encode(
+                    [text for text, _ in batch],
+                    batch_size=ENCODE_BATCH_SIZE,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True
+                )
+                for (_, future), embedding in zip(batch, embeddings):
+                    future.set_result(embedding.reshape(1, -1))
+                    
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+    
     def add_to_conversation(self, role: str, content: str):
         """Add message to conversation history"""
-        # Add to short-term memory
+        # Add to short-term memory (the deque drops the oldest message)
         self.short_term_memory.append({
             'role': role,
             'content': content,
             'timestamp': datetime.now()
         })
         
-        # Keep only recent messages in short-term memory
-        if len(self.short_term_memory) > self.config.max_short_term_memory:
-            self.short_term_memory.pop(0)
-        
-        # Store in database
-        self.conn.execute(
-            "INSERT INTO conversations (role, content) VALUES (?, ?)",
-            (role, content)
-        )
-        self.conn.commit()
+        # Store in database (written by the background writer)
+        self._write_queue.put((role, content))
     
-    def get_recent_conversation(self, limit: int = 5) -> List[Dict[str, Any]]:
+    def _conversation_writer(self):
+        """Worker thread that batches conversation inserts on its own connection"""
+        conn = self._connect()
+        while True:
+            rows = [self._write_queue.get()]
+            while len(rows) < CONVERSATION_WRITE_BATCH:
+                try:
+                    rows.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            try:
+                conn.executemany(
+                    "INSERT INTO conversations (role, content) VALUES (?, ?)",
+                    rows
+                )
+                conn.commit()
+            except Exception as e:
+                self.logger.error(f"Error writing conversation history: {e}")
+            finally:
+                for _ in rows:
+                    self._write_queue.task_done()
+    
+    def flush_conversations(self):
+        """Block until queued conversation messages are written"""
+        self._write_queue.join()
+    
+    def get_recent_conversation(self, limit: int = 5, from_disk: bool = False) -> List[Dict[str, Any]]:
         """Get recent conversation history"""
+        # Serve from short-term memory unless the caller needs more than it holds
+        if not from_disk and limit <= self.short_term_memory.maxlen:
+            return list(self.short_term_memory)[-limit:] if limit > 0 else []
+        
+        return self._load_recent_conversation(limit)
+    
+    def _load_recent_conversation(self, limit: int) -> List[Dict[str, Any]]:
+        """Read the most recent conversation messages from the database"""
+        self.flush_conversations()
         cursor = self.conn.execute(
             "SELECT role, content, timestamp FROM conversations ORDER BY timestamp DESC LIMIT ?",
             (limit,)
@@ -179,24 +466,20 @@ class MemorySystem:
         )
         memory_id = cursor.lastrowid
         self.conn.commit()
+        self.memory_revision = memory_id
         
         # Store vector embedding if available
         if self.embedding_model and self.vector_index is not None:
             try:
-                embedding = self.embedding_model.encode([content])
-                # Normalize for cosine similarity
-                faiss.normalize_L2(embedding)
-                
-                self.vector_index.add(embedding)
-                self.vector_metadata.append({
-                    'id': memory_id,
-                    'content': content,
-                    'memory_type': memory_type,
-                    'metadata': metadata
-                })
+                embedding = self._embed_async(content).result()
                 
-                # Save updated index
-                self._save_vector_index()
+                with self._index_lock:
+                    self.vector_index.add_with_ids(embedding, np.array([memory_id], dtype='int64'))
+                    
+                    # Persist in the background instead of on every insert
+                    self._dirty_count += 1
+                    if self._dirty_count >= INDEX_FLUSH_BATCH:
+                        self._flush_requested.set()
                 
             except Exception as e:
                 self.logger.error(f"Error storing vector embedding: {e}")
@@ -209,18 +492,28 @@ class MemorySystem:
         
         try:
             # Generate query embedding
-            query_embedding = self.embedding_model.encode([query])
-            faiss.normalize_L2(query_embedding)
+            query_embedding = self._embed_async(query).result()
             
             # Search vector index
-            scores, indices = self.vector_index.search(query_embedding, limit)
+            with self._index_lock:
+                self._tune_search(limit)
+                scores, memory_ids = self.vector_index.search(query_embedding, limit)
             
-            results = []
-            for i, idx in enumerate(indices[0]):
-                if idx != -1 and scores[0][i] > 0.3:  # Similarity threshold
-                    results.append(self.vector_metadata[idx]['content'])
+            # Keep hits above the similarity threshold, in score order
+            mask = (scores[0] > 0.3) & (memory_ids[0] != -1)
+            keep_ids = memory_ids[0][mask].tolist()
+            if not keep_ids:
+                return []
             
-            return results
+            # Fetch the matching contents in one query
+            placeholders = ",".join("?" * len(keep_ids))
+            rows = self.conn.execute(
+                f"SELECT id, content FROM memories WHERE id IN ({placeholders})",
+                keep_ids
+            ).fetchall()
+            contents = dict(rows)
+            
+            return [contents[memory_id] for memory_id in keep_ids if memory_id in contents]
             
         except Exception as e:
             self.logger.error(f"Error in vector search: {e}")
@@ -228,6 +521,20 @@ class MemorySystem:
     
     def _text_search_memories(self, query: str, limit: int) -> List[str]:
         """Fallback text-based memory search"""
+        if self.fts_available:
+            terms = re.findall(r'\w+', query)
+            if not terms:
+                return []
+            
+            try:
+                cursor = self.conn.execute(
+                    "SELECT content FROM memories_fts WHERE memories_fts MATCH ? ORDER BY rank LIMIT ?",
+                    (" OR ".join(f'"{term}"' for term in terms), limit)
+                )
+                return [row[0] for row in cursor.fetchall()]
+            except sqlite3.OperationalError as e:
+                self.logger.error(f"Error in full-text search: {e}")
+        
         cursor = self.conn.execute(
             "SELECT content FROM memories WHERE content LIKE ? ORDER BY timestamp DESC LIMIT ?",
             (f"%{query}%", limit)
@@ -242,19 +549,40 @@ class MemorySystem:
             (key, value)
         )
         self.conn.commit()
+        self._pref_cache[key] = value
         
         # Also store as memory for context
         self.store_memory(f"User preference: {key} = {value}", "user_preference")
     
     def get_user_preference(self, key: str, default: Any = None) -> Any:
         """Get user preference"""
-        cursor = self.conn.execute(
-            "SELECT value FROM user_preferences WHERE key = ?",
-            (key,)
-        )
+        if key not in self._pref_cache:
+            cursor = self.conn.execute(
+                "SELECT value FROM user_preferences WHERE key = ?",
+                (key,)
+            )
+            
+            result = cursor.fetchone()
+            self._pref_cache[key] = result[0] if result else None
         
-        result = cursor.fetchone()
-        return result[0] if result else default
+        value = self._pref_cache[key]
+        return value if value is not None else default
+    
+    def _flush_worker(self):
+        """Worker thread that periodically persists the vector index"""
+        while True:
+            self._flush_requested.wait(INDEX_FLUSH_INTERVAL)
+            self._flush_requested.clear()
+            self.flush_vector_index()
+            self._maybe_upgrade_index()
+    
+    def flush_vector_index(self):
+        """Write the vector index to disk if it has unsaved inserts"""
+        with self._index_lock:
+            if not self._dirty_count:
+                return
+            self._save_vector_index()
+            self._dirty_count = 0
     
     def _save_vector_index(self):
         """Save FAISS vector index to disk"""
@@ -263,19 +591,15 @@ class MemorySystem:
         
         try:
             index_path = Path(self.config.vector_db_path) / "memory_index.faiss"
-            metadata_path = Path(self.config.vector_db_path) / "memory_metadata.pkl"
-            
             faiss.write_index(self.vector_index, str(index_path))
             
-            with open(metadata_path, 'wb') as f:
-                pickle.dump(self.vector_metadata, f)
-                
         except Exception as e:
             self.logger.error(f"Error saving vector index: {e}")
     
     def cleanup_old_conversations(self, days: int = 30):
         """Clean up old conversation history"""
         cutoff_date = datetime.now() - timedelta(days=days)
+        self.flush_conversations()
         self.conn.execute(
             "DELETE FROM conversations WHERE timestamp < ?",
             (cutoff_date,)
@@ -286,6 +610,7 @@ class MemorySystem:
     def get_memory_stats(self) -> Dict[str, int]:
         """Get memory system statistics"""
         stats = {}
+        self.flush_conversations()
         
         # Count memories
         cursor = self.conn.execute("SELECT COUNT(*) FROM memories")
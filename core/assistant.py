@@ -4,9 +4,11 @@ Orchestrates all components of the voice assistant
 """
 
 import logging
+import queue
+import re
 import threading
 import time
-from typing import Optional
+from typing import Iterable, Optional
 
 from core.config import Config
 from core.voice_input import VoiceInput
@@ -15,6 +17,9 @@ from core.command_handler import CommandHandler
 from brain.llm_brain import LLMBrain
 from brain.memory_system import MemorySystem
 
+# Sentence boundary at which streamed text is handed to TTS
+SENTENCE_END_RE = re.compile(r'[.!?](?=\s)')
+
 class CommandEcho:
     """Main CommandEcho Assistant"""
     
@@ -63,6 +68,8 @@ class CommandEcho:
     def stop(self):
         """Stop the assistant"""
         self.running = False
+        if self.voice_input:
+            self.voice_input.stop()
         self.logger.info("CommandEcho stopped")
     
     def _get_greeting(self) -> str:
@@ -89,8 +96,7 @@ class CommandEcho:
                     break
                 
                 if user_input:
-                    response = self._process_input(user_input)
-                    print(f"\nCommandEcho: {response}")
+                    self._process_input(user_input)
                     
             except KeyboardInterrupt:
                 break
@@ -105,33 +111,50 @@ class CommandEcho:
         
         self.logger.info("Listening for wake word or voice commands...")
         
+        # Recognition runs in its own thread so this loop blocks only until an utterance is ready
+        self._input_q = queue.Queue()
+        listener = threading.Thread(target=self._listen_worker, daemon=True)
+        listener.start()
+        
         while self.running:
             try:
-                # Listen for input
-                user_input = self.voice_input.listen()
+                try:
+                    user_input = self._input_q.get(timeout=1)
+                except queue.Empty:
+                    continue
                 
-                if user_input:
-                    self.logger.info(f"User said: {user_input}")
-                    
-                    # Check for exit commands
-                    if any(phrase in user_input.lower() for phrase in ['goodbye', 'bye bye', 'stop listening']):
-                        self._respond("Goodbye! Have a great day!")
-                        break
-                    
-                    # Process the input
-                    response = self._process_input(user_input)
-                    self._respond(response)
+                self.logger.info(f"User said: {user_input}")
+                
+                # Check for exit commands
+                if any(phrase in user_input.lower() for phrase in ['goodbye', 'bye bye', 'stop listening']):
+                    self._respond("Goodbye! Have a great day!")
+                    break
                 
-                time.sleep(0.1)  # Small delay to prevent excessive CPU usage
+                # Process the input
+                self._process_input(user_input)
                 
             except KeyboardInterrupt:
                 break
             except Exception as e:
                 self.logger.error(f"Error in voice mode loop: {e}")
+        
+        # Also ends the listener's wait for the wake word
+        self.running = False
+        self.voice_input.stop()
+    
+    def _listen_worker(self):
+        """Worker thread that queues recognized utterances"""
+        while self.running:
+            try:
+                user_input = self.voice_input.listen()
+                if user_input:
+                    self._input_q.put(user_input)
+            except Exception as e:
+                self.logger.error(f"Error listening for voice input: {e}")
                 time.sleep(1)  # Wait before retrying
     
     def _process_input(self, user_input: str) -> str:
-        """Process user input and generate response"""
+        """Process user input, deliver the response and return it"""
         try:
             # Store the user input in short-term memory
             self.memory.add_to_conversation("user", user_input)
@@ -139,9 +162,10 @@ class CommandEcho:
             # Check if this is a system command
             if self.command_handler.is_system_command(user_input):
                 response = self.command_handler.handle_command(user_input)
+                self._deliver(response)
             else:
-                # Generate AI response
-                response = self.brain.generate_response(user_input)
+                # Stream the AI response so output starts with the first tokens
+                response = self._deliver_stream(self.brain.generate_response_stream(user_input))
             
             # Store the response in memory
             self.memory.add_to_conversation("assistant", response)
@@ -150,7 +174,45 @@ class CommandEcho:
             
         except Exception as e:
             self.logger.error(f"Error processing input: {e}")
-            return "I'm sorry, I encountered an error processing your request. Please try again."
+            response = "I'm sorry, I encountered an error processing your request. Please try again."
+            self._deliver(response)
+            return response
+    
+    def _deliver(self, text: str):
+        """Print or speak a complete response"""
+        if self.text_mode:
+            print(f"\nCommandEcho: {text}")
+        else:
+            self._respond(text)
+    
+    def _deliver_stream(self, chunks: Iterable[str]) -> str:
+        """Print or speak a streamed response as it arrives and return the full text"""
+        parts = []
+        
+        if self.text_mode:
+            print("\nCommandEcho: ", end='', flush=True)
+            for chunk in chunks:
+                parts.append(chunk)
+                print(chunk, end='', flush=True)
+            print()
+        else:
+            # Speak each complete sentence while the rest is still being decoded
+            pending = ""
+            for chunk in chunks:
+                parts.append(chunk)
+                pending += chunk
+                
+                last_end = None
+                for last_end in SENTENCE_END_RE.finditer(pending):
+                    pass
+                if last_end:
+                    self._respond(pending[:last_end.end()].strip())
+                    pending = pending[last_end.end():]
+            
+            if pending.strip():
+                self._respond(pending.strip())
+        
+        return "".join(parts).strip()
     
     def _respond(self, text: str):
         """Send response to user"""
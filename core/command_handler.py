@@ -5,12 +5,50 @@ Handles system commands and integrates with tools
 
 import logging
 import re
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
 from tools.system_control import SystemControl
 from tools.file_manager import FileManager
 from tools.app_launcher import AppLauncher
 
+# Command patterns by category
+RAW_PATTERNS = {
+    'volume': [r'set volume to (\d+)', r'volume (\d+)', r'turn volume (up|down)'],
+    'brightness': [r'set brightness to (\d+)', r'brightness (\d+)'],
+    'open_app': [r'open (.+)', r'launch (.+)', r'start (.+)'],
+    'close_app': [r'close (.+)', r'quit (.+)', r'exit (.+)'],
+    # System info queries, one category per query (in priority order)
+    'battery': [r'battery'],
+    'time': [r'what time', r'current time'],
+    'storage': [r'storage'],
+    'sysinfo': [r'system info'],
+    'file_search': [r'find file (.+)', r'search for (.+)', r'locate (.+)'],
+    'memory_command': [r'remember (.+)', r'my name is (.+)', r'save (.+)']
+}
+
+# The patterns are unanchored substrings, and every one contains at least one
+# of these strings, so input containing none of them anywhere (not only as whole
+# words: "restart" must still reach "start (.+)") can skip the regex entirely
+TRIGGER_SUBSTRINGS = (
+    'volume', 'brightness', 'open', 'launch', 'start', 'close', 'quit', 'exit',
+    'battery', 'time', 'storage', 'find', 'search', 'locate', 'remember', 'name',
+    'save', 'system', 'info'
+)
+
+_TRIGGER_RE = re.compile("|".join(map(re.escape, TRIGGER_SUBSTRINGS)))
+
+# Phrases inside a memory command that decide how it is stored
+MEMORY_PHRASES = {
+    'my name is': 'name'
+}
+
+def _memory_kind(text_lower: str) -> str:
+    """Classify a memory command by the first listed memory phrase it contains"""
+    for phrase, kind in MEMORY_PHRASES.items():
+        if phrase in text_lower:
+            return kind
+    return 'general'
+
 class CommandHandler:
     """Handles system commands and tool integration"""
     
@@ -24,74 +62,71 @@ class CommandHandler:
         self.file_manager = FileManager()
         self.app_launcher = AppLauncher()
         
-        # Command patterns
-        self.command_patterns = {
-            'volume': [r'set volume to (\d+)', r'volume (\d+)', r'turn volume (up|down)'],
-            'brightness': [r'set brightness to (\d+)', r'brightness (\d+)'],
-            'open_app': [r'open (.+)', r'launch (.+)', r'start (.+)'],
-            'close_app': [r'close (.+)', r'quit (.+)', r'exit (.+)'],
-            'system_info': [r'battery', r'what time', r'current time', r'system info', r'storage'],
-            'file_search': [r'find file (.+)', r'search for (.+)', r'locate (.+)'],
-            'memory_command': [r'remember (.+)', r'my name is (.+)', r'save (.+)']
+        # All command patterns as one case-insensitive alternation, with a named
+        # group "<category>__<index>" around each pattern. Every branch is an
+        # anchored lookahead so earlier categories and patterns keep priority.
+        self._master_re = re.compile("|".join(
+            rf"^(?=.*?(?P<{category}__{i}>{pattern}))"
+            for category, patterns in RAW_PATTERNS.items()
+            for i, pattern in enumerate(patterns)
+        ), re.IGNORECASE)
+        
+        # Handler for each category and whether it also takes the lowercased text
+        handlers = {
+            'volume': (self._handle_volume_command, True),
+            'brightness': (self._handle_brightness_command, False),
+            'open_app': (self._handle_open_app_command, False),
+            'close_app': (self._handle_close_app_command, False),
+            'battery': (self.system_control.get_battery_info, False),
+            'time': (self.system_control.get_current_time, False),
+            'sysinfo': (self.system_control.get_system_info, False),
+            'storage': (self.system_control.get_storage_info, False),
+            'file_search': (self._handle_file_search_command, False),
+            'memory_command': (self._handle_memory_command, True)
         }
+        
+        # Precomputed dispatch: group name -> (handler, argument group index, pass_lower)
+        self._dispatch = {}
+        for category, patterns in RAW_PATTERNS.items():
+            handler, pass_lower = handlers[category]
+            for i, pattern in enumerate(patterns):
+                name = f"{category}__{i}"
+                arg_group = self._master_re.groupindex[name] + 1 if re.compile(pattern).groups else None
+                self._dispatch[name] = (handler, arg_group, pass_lower)
+        
+        # The caller checks is_system_command before handle_command on the same
+        # text, so the last (text, text_lower, match) is kept for reuse
+        self._last_analysis = None
     
     def is_system_command(self, text: str) -> bool:
         """Check if the input is a system command"""
+        return self._analyze(text)[1] is not None
+    
+    def _analyze(self, text: str) -> Tuple[str, Any]:
+        """Lowercase text once and match it against the command patterns"""
+        if self._last_analysis is not None and self._last_analysis[0] == text:
+            return self._last_analysis[1:]
+        
         text_lower = text.lower()
+        match = None
         
-        # Check against all command patterns
-        for command_type, patterns in self.command_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    return True
+        # Cheap trigger substring check before running the regex
+        if _TRIGGER_RE.search(text_lower):
+            match = self._master_re.search(text)
         
-        return False
+        self._last_analysis = (text, text_lower, match)
+        return text_lower, match
     
     def handle_command(self, text: str) -> str:
         """Handle system command and return response"""
-        text_lower = text.lower()
-        
         try:
-            # Volume control
-            for pattern in self.command_patterns['volume']:
-                match = re.search(pattern, text_lower)
-                if match:
-                    return self._handle_volume_command(match, text_lower)
-            
-            # Brightness control
-            for pattern in self.command_patterns['brightness']:
-                match = re.search(pattern, text_lower)
-                if match:
-                    return self._handle_brightness_command(match)
-            
-            # App launching
-            for pattern in self.command_patterns['open_app']:
-                match = re.search(pattern, text_lower)
-                if match:
-                    return self._handle_open_app_command(match)
-            
-            # App closing
-            for pattern in self.command_patterns['close_app']:
-                match = re.search(pattern, text_lower)
-                if match:
-                    return self._handle_close_app_command(match)
-            
-            # System info
-            for pattern in self.command_patterns['system_info']:
-                if re.search(pattern, text_lower):
-                    return self._handle_system_info_command(text_lower)
-            
-            # File search
-            for pattern in self.command_patterns['file_search']:
-                match = re.search(pattern, text_lower)
-                if match:
-                    return self._handle_file_search_command(match)
-            
-            # Memory commands
-            for pattern in self.command_patterns['memory_command']:
-                match = re.search(pattern, text_lower)
-                if match:
-                    return self._handle_memory_command(match, text)
+            text_lower, match = self._analyze(text)
+            if match:
+                handler, arg_group, pass_lower = self._dispatch[match.lastgroup]
+                args = [] if arg_group is None else [match.group(arg_group)]
+                if pass_lower:
+                    args.append(text_lower)
+                return handler(*args)
             
             # If no specific command matched, let the AI handle it
             return self.brain.generate_response(text)
@@ -100,55 +135,44 @@ class CommandHandler:
             self.logger.error(f"Error handling command: {e}")
             return f"I encountered an error while executing that command: {str(e)}"
     
-    def _handle_volume_command(self, match, text_lower: str) -> str:
+    def _handle_volume_command(self, value: str, text_lower: str) -> str:
         """Handle volume control commands"""
         if 'up' in text_lower:
             result = self.system_control.adjust_volume(10)
         elif 'down' in text_lower:
             result = self.system_control.adjust_volume(-10)
         else:
-            volume = int(match.group(1))
+            volume = int(value)
             result = self.system_control.set_volume(volume)
         
         return result
     
-    def _handle_brightness_command(self, match) -> str:
+    def _handle_brightness_command(self, value: str) -> str:
         """Handle brightness control commands"""
-        brightness = int(match.group(1))
+        brightness = int(value)
         return self.system_control.set_brightness(brightness)
     
-    def _handle_open_app_command(self, match) -> str:
+    def _handle_open_app_command(self, app_name: str) -> str:
         """Handle app opening commands"""
-        app_name = match.group(1).strip()
+        app_name = app_name.strip()
         return self.app_launcher.launch_app(app_name)
     
-    def _handle_close_app_command(self, match) -> str:
+    def _handle_close_app_command(self, app_name: str) -> str:
         """Handle app closing commands"""
-        app_name = match.group(1).strip()
+        app_name = app_name.strip()
         return self.app_launcher.close_app(app_name)
     
-    def _handle_system_info_command(self, text_lower: str) -> str:
-        """Handle system information commands"""
-        if 'battery' in text_lower:
-            return self.system_control.get_battery_info()
-        elif 'time' in text_lower:
-            return self.system_control.get_current_time()
-        elif 'storage' in text_lower:
-            return self.system_control.get_storage_info()
-        else:
-            return self.system_control.get_system_info()
-    
-    def _handle_file_search_command(self, match) -> str:
+    def _handle_file_search_command(self, search_term: str) -> str:
         """Handle file search commands"""
-        search_term = match.group(1).strip()
+        search_term = search_term.strip()
         return self.file_manager.search_files(search_term)
     
-    def _handle_memory_command(self, match, original_text: str) -> str:
+    def _handle_memory_command(self, content: str, text_lower: str) -> str:
         """Handle memory-related commands"""
-        content = match.group(1).strip()
+        content = content.strip()
         
         # Check if it's a name introduction
-        if 'my name is' in original_text.lower():
+        if _memory_kind(text_lower) == 'name':
             name = content
             self.memory.store_user_preference('name', name)
             return f"Nice to meet you, {name}! I'll remember your name."
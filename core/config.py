@@ -2,13 +2,26 @@
 Configuration management for CommandEcho
 """
 
+import functools
 import json
 import os
+import sys
 from pathlib import Path
 from dataclasses import dataclass, asdict
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
-@dataclass
+# orjson is a faster drop-in for reading and writing the config (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Config sections are replaced whole on load, never mutated per field; slots
+# need Python 3.10+
+DATACLASS_OPTIONS = {'frozen': True, 'slots': True} if sys.version_info >= (3, 10) else {'frozen': True}
+
+@dataclass(**DATACLASS_OPTIONS)
 class VoiceConfig:
     """Voice-related configuration"""
     wake_word: str = "echo"
@@ -16,8 +29,11 @@ class VoiceConfig:
     speech_rate: int = 200
     speech_volume: float = 0.9
     voice_id: int = 0  # 0 for default, 1 for female voice typically
+    wake_word_model_path: str = "models/vosk-model-small-en-us-0.15"  # Local Vosk model for wake word spotting
+    porcupine_access_key: str = ""  # Picovoice AccessKey; enables the Porcupine keyword spotter
+    porcupine_keyword_path: str = ""  # .ppn file for the wake word if it is not a built-in keyword
     
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class LLMConfig:
     """LLM-related configuration"""
     model_path: str = "models/llama-3-8b-instruct.Q4_K_M.gguf"
@@ -25,14 +41,41 @@ class LLMConfig:
     max_tokens: int = 512
     temperature: float = 0.7
     top_p: float = 0.9
+    response_cache_threshold: float = 0.95  # Cosine similarity for reusing a prior response
+    response_cache_size: int = 256  # Cached responses kept, least recently used evicted first
+    prompt_cache_mb: int = 512  # RAM budget for cached prompt KV states
+    history_token_budget: int = 768  # Tokens of recent turns kept verbatim in the context
+    summary_max_tokens: int = 200  # Length of the summary older turns are compacted into
+    n_threads: int = 0  # 0 = auto-detect (all cores, capped at 16)
+    n_batch: int = 2048  # Prompt tokens submitted per decode call
+    n_ubatch: int = 512  # Physical micro-batch size
+    use_mlock: bool = True
+    use_mmap: bool = True
+    flash_attn: bool = True
+    offload_kqv: bool = True
+    n_gpu_layers: int = -1  # Layers offloaded to GPU when supported (-1 = all, 0 = CPU only)
+    main_gpu: int = 0
     
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class MemoryConfig:
     """Memory system configuration"""
     memory_db_path: str = "data/memory/memory.db"
     vector_db_path: str = "data/memory/vectors"
     max_short_term_memory: int = 10
     embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_backend: str = "onnx"  # "onnx" (int8-quantized) or "torch"
+    embedding_quantization: str = "avx512_vnni"  # ONNX quantization config: arm64, avx2, avx512, avx512_vnni
+
+# Directories the application needs at startup
+DIRECTORIES = ("config", "models", "data/memory", "logs")
+
+@functools.lru_cache(maxsize=1)
+def _create_directories():
+    """Create necessary directories (once per process)"""
+    for directory in DIRECTORIES:
+        # A stat is cheaper than mkdir failing with EEXIST (on-access scanners hook mkdir)
+        if not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
 
 class Config:
     """Main configuration class"""
@@ -46,27 +89,25 @@ class Config:
         # Create directories
         self._create_directories()
         
+        # Flat (section, key) -> value view used by get()
+        self._values: Dict[Tuple[str, str], Any] = {}
+        
         # Load existing config or create default
         self.load()
     
     def _create_directories(self):
         """Create necessary directories"""
-        directories = [
-            "config",
-            "models", 
-            "data/memory",
-            "logs"
-        ]
-        
-        for directory in directories:
-            Path(directory).mkdir(parents=True, exist_ok=True)
+        _create_directories()
     
     def load(self):
         """Load configuration from file"""
         if self.config_file.exists():
             try:
-                with open(self.config_file, 'r') as f:
-                    data = json.load(f)
+                if ORJSON_AVAILABLE:
+                    data = orjson.loads(self.config_file.read_bytes())
+                else:
+                    with open(self.config_file, 'r') as f:
+                        data = json.load(f)
                 
                 # Update configurations
                 if 'voice' in data:
@@ -81,6 +122,16 @@ class Config:
         else:
             # Save default config
             self.save()
+        
+        self._index_values()
+    
+    def _index_values(self):
+        """Rebuild the flat lookup table from the section objects"""
+        self._values = {
+            (section, key): value
+            for section in ('voice', 'llm', 'memory')
+            for key, value in asdict(getattr(self, section)).items()
+        }
     
     def save(self):
         """Save configuration to file"""
@@ -90,12 +141,15 @@ class Config:
             'memory': asdict(self.memory)
         }
         
-        with open(self.config_file, 'w') as f:
-            json.dump(config_data, f, indent=2)
+        # Write to a temporary file and swap it in so a partial write never replaces the config
+        tmp_file = self.config_file.with_name(self.config_file.name + ".tmp")
+        if ORJSON_AVAILABLE:
+            tmp_file.write_bytes(orjson.dumps(config_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(tmp_file, 'w') as f:
+                json.dump(config_data, f, indent=2)
+        os.replace(tmp_file, self.config_file)
     
     def get(self, section: str, key: str, default=None):
         """Get configuration value"""
-        section_obj = getattr(self, section, None)
-        if section_obj:
-            return getattr(section_obj, key, default)
-        return default
+        return self._values.get((section, key), default)
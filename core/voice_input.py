@@ -3,11 +3,40 @@ Voice Input Handler for CommandEcho
 Handles speech recognition and wake word detection
 """
 
+import json
 import logging
+import struct
+import numpy as np
 import speech_recognition as sr
 import threading
 import time
-from typing import Optional
+from pathlib import Path
+from typing import Callable, Optional
+
+# Optional local recognizer for the wake word stage
+try:
+    import vosk
+    VOSK_AVAILABLE = True
+except ImportError:
+    VOSK_AVAILABLE = False
+
+# Optional on-device keyword spotter fed with raw microphone frames
+try:
+    import pvporcupine
+    import sounddevice as sd
+    PORCUPINE_AVAILABLE = True
+except (ImportError, OSError):
+    PORCUPINE_AVAILABLE = False
+
+# Sample rate the audio is converted to for local recognition
+WAKE_SAMPLE_RATE = 16000
+
+def audio_level(pcm: bytes) -> int:
+    """RMS level of 16-bit PCM audio on a 0-100 scale"""
+    frame = np.frombuffer(pcm, dtype=np.int16)
+    if not frame.size:
+        return 0
+    return min(100, int(np.sqrt(np.mean(frame.astype(np.float64) ** 2)) / 327.68))
 
 class VoiceInput:
     """Handles voice input and speech recognition"""
@@ -20,16 +49,122 @@ class VoiceInput:
         self.recognizer = sr.Recognizer()
         self.microphone = sr.Microphone()
         
-        # Adjust for ambient noise
-        self.logger.info("Adjusting for ambient noise...")
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=2)
+        # Called with the level of captured audio, e.g. to drive a level meter
+        self.level_callback: Optional[Callable[[int], None]] = None
+        
+        # Set by stop() to end a wait for the wake word
+        self._stop_event = threading.Event()
+        
+        # Adjust for ambient noise in the background; listening waits for it
+        self._calibrated = threading.Event()
+        threading.Thread(target=self._calibrate, daemon=True).start()
+        
+        # Spot the wake word locally instead of a Google Speech round trip per utterance
+        self._wake_detector = self._load_wake_detector()
+        self._wake_model = self._load_wake_model() if self._wake_detector is None else None
         
         self.logger.info("Voice input initialized")
     
+    def _calibrate(self):
+        """Measure ambient noise to set the recognizer's energy threshold"""
+        try:
+            self.logger.info("Adjusting for ambient noise...")
+            with self.microphone as source:
+                self.recognizer.adjust_for_ambient_noise(source, duration=2)
+        except Exception as e:
+            self.logger.error(f"Error adjusting for ambient noise: {e}")
+        finally:
+            self._calibrated.set()
+    
+    def _load_wake_detector(self):
+        """Create the Porcupine keyword spotter if it is installed and configured"""
+        if not PORCUPINE_AVAILABLE or not self.config.porcupine_access_key:
+            return None
+        
+        try:
+            if self.config.porcupine_keyword_path:
+                return pvporcupine.create(
+                    access_key=self.config.porcupine_access_key,
+                    keyword_paths=[self.config.porcupine_keyword_path]
+                )
+            return pvporcupine.create(
+                access_key=self.config.porcupine_access_key,
+                keywords=[self.config.wake_word.lower()]
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to create Porcupine wake word detector: {e}")
+            return None
+    
+    def stop(self):
+        """Stop waiting for the wake word"""
+        self._stop_event.set()
+    
+    def _keyword_spotted(self) -> bool:
+        """Feed raw microphone frames to the keyword spotter until it fires or stop() is called"""
+        detector = self._wake_detector
+        pcm_format = f"{detector.frame_length}h"
+        
+        # One stream for the whole wait, so no frames are lost between reads
+        with sd.RawInputStream(samplerate=detector.sample_rate, blocksize=detector.frame_length,
+                               dtype='int16', channels=1) as stream:
+            while not self._stop_event.is_set():
+                data, _ = stream.read(detector.frame_length)
+                self._report_level(data)
+                if detector.process(struct.unpack_from(pcm_format, data)) >= 0:
+                    return True
+        
+        return False
+    
+    def _report_level(self, pcm: bytes):
+        """Pass the level of captured audio to the level callback, if any"""
+        if self.level_callback is not None:
+            self.level_callback(audio_level(pcm))
+    
+    def _load_wake_model(self):
+        """Load the local Vosk model used to spot the wake word, if available"""
+        if not VOSK_AVAILABLE:
+            return None
+        
+        model_path = Path(self.config.wake_word_model_path)
+        if not model_path.exists():
+            self.logger.info(f"Vosk model not found at {model_path}, wake word detection uses Google Speech")
+            return None
+        
+        try:
+            vosk.SetLogLevel(-1)
+            return vosk.Model(str(model_path))
+        except Exception as e:
+            self.logger.error(f"Failed to load Vosk model: {e}")
+            return None
+    
+    def _heard_wake_word(self, audio: sr.AudioData) -> bool:
+        """Check a short utterance for the wake word"""
+        wake_word = self.config.wake_word.lower()
+        
+        if self._wake_model is None:
+            text = self.recognizer.recognize_google(audio, language='en-US')
+            return wake_word in text.lower()
+        
+        # Decode locally against a grammar of just the wake word
+        recognizer = vosk.KaldiRecognizer(self._wake_model, WAKE_SAMPLE_RATE, json.dumps([wake_word, "[unk]"]))
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=WAKE_SAMPLE_RATE, convert_width=2))
+        return wake_word in json.loads(recognizer.FinalResult()).get('text', '')
+    
     def listen(self) -> Optional[str]:
         """Listen for voice input"""
+        self._calibrated.wait()
+        
         try:
+            if not self.config.always_listening and self._wake_detector is not None:
+                # The keyword spotter watches raw frames; only the command is transcribed
+                if not self._keyword_spotted():
+                    return None
+                
+                self.logger.info("Wake word detected, listening for command...")
+                with self.microphone as source:
+                    audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
+                return self.recognizer.recognize_google(audio, language='en-US').strip()
+            
             with self.microphone as source:
                 # Listen for audio
                 self.logger.debug("Listening...")
@@ -43,8 +178,7 @@ class VoiceInput:
                     
                     # Quick recognition for wake word
                     try:
-                        text = self.recognizer.recognize_google(audio, language='en-US')
-                        if self.config.wake_word.lower() not in text.lower():
+                        if not self._heard_wake_word(audio):
                             return None  # Wake word not detected
                         
                         # Wake word detected, listen for actual command
@@ -55,6 +189,7 @@ class VoiceInput:
                         return None  # Couldn't understand wake word
             
             # Recognize the speech
+            self._report_level(audio.get_raw_data(convert_width=2))
             text = self.recognizer.recognize_google(audio, language='en-US')
             return text.strip()
             
@@ -73,6 +208,8 @@ class VoiceInput:
     
     def listen_once(self, timeout: int = 5) -> Optional[str]:
         """Listen for a single command with timeout"""
+        self._calibrated.wait()
+        
         try:
             with self.microphone as source:
                 self.logger.info("Listening for command...")
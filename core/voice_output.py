@@ -3,10 +3,40 @@ Voice Output Handler for CommandEcho
 Handles text-to-speech functionality
 """
 
+import functools
 import logging
+import os
 import pyttsx3
+import tempfile
 import threading
-from queue import Queue
+import wave
+from queue import Empty, SimpleQueue
+from typing import List, Optional, Tuple
+
+# Optional audio output, used to play synthesized speech off the TTS thread
+try:
+    import sounddevice as sd
+    SOUNDDEVICE_AVAILABLE = True
+except (ImportError, OSError):
+    SOUNDDEVICE_AVAILABLE = False
+
+# Queued utterances are spoken together in one driver run, up to this many
+# items or characters so priority speech is not held back for long
+SPEECH_BATCH_SIZE = 4
+SPEECH_BATCH_CHARS = 500
+
+# Frames written to the output stream per call during playback
+PLAYBACK_CHUNK_FRAMES = 1024
+
+# Raw stream sample formats by WAV sample width in bytes
+SAMPLE_DTYPES = {1: 'uint8', 2: 'int16', 3: 'int24', 4: 'int32'}
+
+@functools.lru_cache(maxsize=None)
+def _list_voices(driver_name: Optional[str] = None) -> Tuple[Tuple[str, str], ...]:
+    """Enumerate installed voices as (id, name) pairs, once per TTS driver"""
+    # pyttsx3.init returns the already-running engine for this driver
+    voices = pyttsx3.init(driver_name).getProperty('voices') or []
+    return tuple((voice.id, voice.name) for voice in voices)
 
 class VoiceOutput:
     """Handles text-to-speech output"""
@@ -24,8 +54,22 @@ class VoiceOutput:
             self.logger.error(f"Failed to initialize TTS engine: {e}")
             self.engine = None
         
+        # Priority speech bumps the generation; queued items from older
+        # generations are skipped instead of being removed from the queues
+        self._generation = 0
+        
+        # Synthesized audio is played from its own thread so rendering the next
+        # utterance overlaps playback of the current one
+        self.playback_queue = SimpleQueue()
+        self._stop_playback = threading.Event()
+        self._file_playback = SOUNDDEVICE_AVAILABLE and self.engine is not None
+        self.playback_thread = None
+        if self._file_playback:
+            self.playback_thread = threading.Thread(target=self._playback_worker, daemon=True)
+            self.playback_thread.start()
+        
         # Speech queue for handling multiple requests
-        self.speech_queue = Queue()
+        self.speech_queue = SimpleQueue()
         self.speech_thread = threading.Thread(target=self._speech_worker, daemon=True)
         self.speech_thread.start()
     
@@ -41,11 +85,13 @@ class VoiceOutput:
             # Set volume
             self.engine.setProperty('volume', self.config.speech_volume)
             
-            # Set voice (if available)
-            voices = self.engine.getProperty('voices')
-            if voices and len(voices) > self.config.voice_id:
-                self.engine.setProperty('voice', voices[self.config.voice_id].id)
-                self.logger.info(f"Voice set to: {voices[self.config.voice_id].name}")
+            # Set voice (if available and not already the driver default)
+            voices = _list_voices()
+            if len(voices) > self.config.voice_id:
+                voice_id, voice_name = voices[self.config.voice_id]
+                if voice_id != self.engine.getProperty('voice'):
+                    self.engine.setProperty('voice', voice_id)
+                self.logger.info(f"Voice set to: {voice_name}")
             
         except Exception as e:
             self.logger.error(f"Error configuring voice: {e}")
@@ -56,46 +102,126 @@ class VoiceOutput:
             return
         
         if priority:
-            # Clear queue and speak immediately
-            while not self.speech_queue.empty():
-                try:
-                    self.speech_queue.get_nowait()
-                except:
-                    break
+            # Drop everything queued so far and speak immediately
+            self._generation += 1
         
-        self.speech_queue.put(text)
+        self.speech_queue.put((self._generation, text))
     
     def _speech_worker(self):
         """Worker thread for handling speech queue"""
-        while True:
-            try:
-                text = self.speech_queue.get()
-                if text is None:  # Shutdown signal
+        get = self.speech_queue.get
+        get_nowait = self.speech_queue.get_nowait
+        
+        # Runs until the None shutdown signal; _speak_now handles TTS errors itself
+        for generation, text in iter(get, None):
+            if generation != self._generation:
+                continue  # Superseded by priority speech
+            
+            # Take whatever else is already queued
+            batch = [text]
+            chars = len(text)
+            shutdown = False
+            while len(batch) < SPEECH_BATCH_SIZE and chars < SPEECH_BATCH_CHARS:
+                try:
+                    extra = get_nowait()
+                except Empty:
                     break
-                
-                self._speak_now(text)
-                self.speech_queue.task_done()
-                
-            except Exception as e:
-                self.logger.error(f"Error in speech worker: {e}")
+                if extra is None:
+                    shutdown = True
+                    break
+                if extra[0] != self._generation:
+                    continue
+                batch.append(extra[1])
+                chars += len(extra[1])
+            
+            self._speak_now(batch, generation)
+            
+            if shutdown:
+                break
     
-    def _speak_now(self, text: str):
-        """Immediately speak the given text"""
+    def _speak_now(self, texts: List[str], generation: int):
+        """Immediately speak the given texts in a single driver run"""
         if not self.engine:
             # Fallback to print if TTS not available
-            print(f"CommandEcho: {text}")
+            for text in texts:
+                print(f"CommandEcho: {text}")
             return
         
         try:
-            self.logger.debug(f"Speaking: {text}")
-            self.engine.say(text)
+            if self._file_playback and self._render_to_player(texts, generation):
+                return
+            
+            for text in texts:
+                self.logger.debug(f"Speaking: {text}")
+                self.engine.say(text)
             self.engine.runAndWait()
         except Exception as e:
             self.logger.error(f"Error speaking text: {e}")
-            print(f"CommandEcho: {text}")  # Fallback
+            for text in texts:
+                print(f"CommandEcho: {text}")  # Fallback
+    
+    def _render_to_player(self, texts: List[str], generation: int) -> bool:
+        """Render texts to a WAV file and queue it for playback; False if that is not possible"""
+        fd, path = tempfile.mkstemp(prefix="commandecho_", suffix=".wav")
+        os.close(fd)
+        
+        try:
+            self.logger.debug(f"Rendering speech: {texts}")
+            self.engine.save_to_file(" ".join(texts), path)
+            self.engine.runAndWait()
+            wav = wave.open(path, 'rb')
+        except (wave.Error, EOFError, OSError) as e:
+            # Driver writes a format we cannot stream (e.g. AIFF); speak directly from now on
+            self.logger.info(f"Falling back to direct speech output: {e}")
+            self._file_playback = False
+            self._discard_audio(None, path)
+            return False
+        
+        self.playback_queue.put((generation, wav, path))
+        return True
+    
+    def _playback_worker(self):
+        """Worker thread that plays rendered speech files"""
+        get = self.playback_queue.get
+        while True:
+            item = get()
+            if item is None:  # Shutdown signal
+                break
+            
+            generation, wav, path = item
+            if generation != self._generation:
+                self._discard_audio(wav, path)  # Superseded by priority speech
+                continue
+            
+            self._stop_playback.clear()
+            try:
+                with sd.RawOutputStream(
+                    samplerate=wav.getframerate(),
+                    channels=wav.getnchannels(),
+                    dtype=SAMPLE_DTYPES[wav.getsampwidth()]
+                ) as stream:
+                    while not self._stop_playback.is_set():
+                        frames = wav.readframes(PLAYBACK_CHUNK_FRAMES)
+                        if not frames:
+                            break
+                        stream.write(frames)
+            except Exception as e:
+                self.logger.error(f"Error playing speech: {e}")
+            finally:
+                self._discard_audio(wav, path)
+    
+    def _discard_audio(self, wav, path: str):
+        """Close and delete a rendered speech file"""
+        try:
+            if wav is not None:
+                wav.close()
+            os.remove(path)
+        except OSError as e:
+            self.logger.debug(f"Could not remove speech file {path}: {e}")
     
     def stop_speaking(self):
         """Stop current speech"""
+        self._stop_playback.set()
         if self.engine:
             try:
                 self.engine.stop()
@@ -107,3 +233,7 @@ class VoiceOutput:
         self.speech_queue.put(None)  # Signal shutdown
         if self.speech_thread.is_alive():
             self.speech_thread.join(timeout=2)
+        
+        if self.playback_thread:
+            self.playback_queue.put(None)
+            self.playback_thread.join(timeout=2)
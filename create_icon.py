@@ -2,44 +2,54 @@
 Create a simple icon for CommandEcho
 """
 
+import os
+import struct
+
+# 64x64 RGBA PNG of the CommandEcho robot face (blue head, white eyes and mouth)
+ICON_PNG = (
+    b"\x89\x50\x4e\x47\x0d\x0a\x1a\x0a\x00\x00\x00\x0d\x49\x48\x44\x52\x00\x00"
+    b"\x00\x40\x00\x00\x00\x40\x08\x06\x00\x00\x00\xaa\x69\x71\xde\x00\x00\x00"
+    b"\xed\x49\x44\x41\x54\x78\xda\xed\xdb\xdb\x11\x83\x30\x0c\x44\xd1\xad\xc4"
+    b"\x75\x52\x68\xfa\x49\x1a\x60\x80\xd1\xcb\x48\xb9\x9e\xf1\xaf\xf0\x9e\x1f"
+    b"\x1b\x2c\xb4\xd6\xfa\xfe\xf3\x14\x00\x00\x00\x00\x00\x00\x00\x00\x50\xf7"
+    b"\xc0\xe3\x73\x3b\x47\x01\x3c\x09\xbc\x13\x44\x6f\x0e\x5e\x01\xa1\x0e\xc1"
+    b"\x33\x21\xd4\x29\x78\x06\x84\xba\x86\x8f\x42\x50\xe7\xf0\x11\x08\xea\x1e"
+    b"\xde\x8b\xa0\x09\xe1\x3d\x08\x9a\x12\xde\x8a\xa0\x49\xe1\x2d\x08\x00\x44"
+    b"\x87\x3f\x1b\x9e\x30\xd6\x7a\x5b\x00\xae\x46\x54\xf8\xa7\xf5\xc2\x01\x3c"
+    b"\x8b\xb5\x20\x44\xd4\x03\x20\x0a\xa0\x6a\xc1\x19\xf5\x00\x00\xa0\x08\xe0"
+    b"\x6d\xbb\x40\x18\x40\xd5\xbe\x9d\x59\xaf\x14\xa0\xdb\xc9\x10\x00\x00\x00"
+    b"\x00\x00\x00\x00\x00\x98\x8b\x50\x7a\x14\xb6\x9e\xe9\x23\xdf\x21\x00\x00"
+    b"\x20\x01\xc0\x83\xb0\x13\xa0\xf4\x93\xd8\x78\x80\x6e\xbb\xc1\xb6\x7b\x81"
+    b"\xd1\x00\x5c\x8d\x01\xc0\xed\x30\xfd\x01\x74\x88\xd0\x23\x44\x97\x18\x7d"
+    b"\x82\x74\x8a\xd2\x2b\x4c\xb7\x38\xff\x0b\xf0\xc7\x08\x00\x00\x00\x00\x00"
+    b"\x00\xfd\xe7\x0f\xb7\xb6\x00\xdc\x96\xe1\xb5\x4a\x00\x00\x00\x00\x49\x45"
+    b"\x4e\x44\xae\x42\x60\x82"
+)
+
+ICON_SIZE = 64
+
+def _ico_from_png(png: bytes) -> bytes:
+    """Wrap PNG data in a single-image ICO container (PNG entries are valid ICO images)"""
+    header = struct.pack('<HHH', 0, 1, 1)
+    entry = struct.pack('<BBBBHHII', ICON_SIZE, ICON_SIZE, 0, 0, 1, 32, len(png), 6 + 16)
+    return header + entry + png
+
 def create_icon():
     """Create a simple CommandEcho icon"""
     try:
-        from PIL import Image, ImageDraw, ImageFont
-        import os
-        
         # Create assets directory
         os.makedirs("assets", exist_ok=True)
         
-        # Create a 64x64 icon
-        size = 64
-        img = Image.new('RGBA', (size, size), (30, 30, 30, 255))
-        draw = ImageDraw.Draw(img)
-        
-        # Draw a simple robot face
-        # Head circle
-        draw.ellipse([8, 8, 56, 56], fill=(0, 120, 212, 255))
-        
-        # Eyes
-        draw.ellipse([18, 20, 26, 28], fill=(255, 255, 255, 255))
-        draw.ellipse([38, 20, 46, 28], fill=(255, 255, 255, 255))
-        
-        # Mouth
-        draw.rectangle([24, 38, 40, 42], fill=(255, 255, 255, 255))
-        
         # Save as PNG
-        img.save("assets/icon.png")
+        with open("assets/icon.png", "wb") as f:
+            f.write(ICON_PNG)
         print("✅ Icon created: assets/icon.png")
         
-        # Try to create ICO for Windows
-        try:
-            img.save("assets/icon.ico")
-            print("✅ Windows icon created: assets/icon.ico")
-        except:
-            print("⚠️  Could not create .ico file (PIL may need additional support)")
+        # Create ICO for Windows
+        with open("assets/icon.ico", "wb") as f:
+            f.write(_ico_from_png(ICON_PNG))
+        print("✅ Windows icon created: assets/icon.ico")
             
-    except ImportError:
-        print("⚠️  PIL not available. Install with: pip install Pillow")
     except Exception as e:
         print(f"❌ Error creating icon: {e}")
 
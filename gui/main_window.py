@@ -5,12 +5,59 @@ Modern interface with chat display and controls
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
+import re
 import threading
 import queue
 import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 import json
+import logging
+import os
+import psutil
+
+# Lines kept in the chat display; older lines are trimmed as new messages arrive
+MAX_CHAT_LINES = 2000
+
+# Seconds between system info samples
+SYSINFO_INTERVAL = 2.0
+
+# Keys that move around or scroll the read-only chat display
+CHAT_NAVIGATION_KEYS = frozenset([
+    'Up', 'Down', 'Left', 'Right', 'Prior', 'Next', 'Home', 'End'
+])
+
+# Settings window fields: (variable attribute, config section, config key, default)
+SETTINGS_FIELDS = (
+    ('wake_word_var', 'voice', 'wake_word', "echo"),
+    ('always_listening_var', 'voice', 'always_listening', False),
+    ('speech_rate_var', 'voice', 'speech_rate', 200),
+    ('speech_volume_var', 'voice', 'speech_volume', 0.9),
+    ('model_path_var', 'llm', 'model_path', "models/llama-3-8b-instruct.Q4_K_M.gguf"),
+    ('temperature_var', 'llm', 'temperature', 0.7),
+    ('max_tokens_var', 'llm', 'max_tokens', 512),
+    ('memory_limit_var', 'memory', 'max_short_term_memory', 10)
+)
+
+# Delay after the last Scale movement before its readout is refreshed
+SCALE_DEBOUNCE_MS = 150
+
+# Keywords for the built-in command intents
+_GREETINGS = ('hello', 'hi', 'hey')
+_THANKS = ('thank you', 'thanks')
+
+# Command intents in priority order, matched case-insensitively in one scan
+_INTENT_RE = re.compile(
+    rf"^(?=.*?\b(?P<greet>{'|'.join(_GREETINGS)})\b)"
+    r"|^(?=.*?\b(?P<time>time)\b)"
+    r"|^(?=.*?\b(?P<weather>weather)\b)"
+    rf"|^(?=.*?\b(?P<thanks>{'|'.join(_THANKS)})\b)",
+    re.IGNORECASE
+)
+
+# Configuration file shown in the settings window
+CONFIG_PATH = Path("config/config.json")
 
 # Custom styling
 class ModernStyle:
@@ -27,11 +74,21 @@ class ModernStyle:
     ACCENT_RED = "#e74c3c"
     ACCENT_ORANGE = "#ff8c00"
     
-    @staticmethod
-    def configure_ttk_style():
+    # Styles are registered with Tk once per process
+    _configured = False
+    
+    @classmethod
+    def configure_ttk_style(cls):
         """Configure modern TTK styles"""
+        if cls._configured:
+            return
+        cls._configured = True
+        
         style = ttk.Style()
         
+        # The clam theme honours custom background and foreground colors
+        style.theme_use('clam')
+        
         # Configure styles for dark theme
         style.configure("Modern.TFrame", background=ModernStyle.BG_DARK)
         style.configure("Accent.TFrame", background=ModernStyle.BG_ACCENT)
@@ -62,23 +119,49 @@ class ModernStyle:
                  background=[("active", "#106ebe"),
                            ("pressed", "#005a9e")])
 
+# Chat display prefix, color and header tag by lowercased sender
+SENDER_META = {
+    'you': ("👤", ModernStyle.ACCENT_BLUE, "user"),
+    'commandecho': ("🤖", ModernStyle.ACCENT_GREEN, "bot"),
+    'system': ("ℹ️", ModernStyle.TEXT_SECONDARY, "sys")
+}
+
 class CommandEchoGUI:
     """Main GUI Application for CommandEcho"""
     
     def __init__(self):
+        self.logger = logging.getLogger(__name__)
         self.root = tk.Tk()
         self.setup_window()
         
-        # Communication queues
-        self.message_queue = queue.Queue()
+        # Communication queues. Messages to the GUI use a deque, whose append and
+        # popleft are atomic, plus an event that is set while messages are waiting
+        self._msg_deque = deque()
+        self._msg_event = threading.Event()
         self.command_queue = queue.Queue()
         
+        # True while an idle-time drain is scheduled, so bursts schedule only one
+        self._drain_pending = False
+        
         # Assistant state
         self.assistant = None
         self.assistant_thread = None
         self.is_listening = False
         self.is_speaking = False
         
+        # Set when the window closes; stops the background workers
+        self._shutdown = threading.Event()
+        
+        # Tracked from Map/Unmap events so workers can skip updates while minimized
+        self._minimized = False
+        
+        # Settings from CONFIG_PATH, re-read only when the file's mtime changes
+        self.config_dict = {}
+        self._config_mtime = None
+        
+        # Last (second, "HH:MM:SS") pair, shared by messages within the same second
+        self._ts_cache = (0, '')
+        
         # GUI components
         self.setup_gui()
         self.setup_styles()
@@ -103,6 +186,20 @@ class CommandEchoGUI:
         
         # Handle window closing
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        
+        # Track minimize/restore
+        self.root.bind("<Unmap>", self._on_unmap)
+        self.root.bind("<Map>", self._on_map)
+    
+    def _on_unmap(self, event):
+        """Note that the main window was minimized"""
+        if event.widget is self.root:
+            self._minimized = True
+    
+    def _on_map(self, event):
+        """Note that the main window was restored"""
+        if event.widget is self.root:
+            self._minimized = False
     
     def setup_styles(self):
         """Setup modern styling"""
@@ -183,6 +280,19 @@ class CommandEchoGUI:
         )
         self.chat_display.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
         
+        # Configure tags for styling
+        self.chat_display.tag_configure("timestamp", foreground=ModernStyle.TEXT_SECONDARY, font=("Consolas", 9))
+        self.chat_display.tag_configure("message", foreground=ModernStyle.TEXT_PRIMARY)
+        
+        # Sender colors; configured after "timestamp" so their foreground takes priority
+        for _, color, sender_tag in SENDER_META.values():
+            self.chat_display.tag_configure(sender_tag, foreground=color)
+        
+        # Read-only for the user without toggling the widget state on every insert
+        self.chat_display.bind("<Key>", self._block_chat_edit)
+        for sequence in ("<<Paste>>", "<<Cut>>", "<<Clear>>", "<Button-2>"):
+            self.chat_display.bind(sequence, lambda e: "break")
+        
         # Input frame
         input_frame = ttk.Frame(chat_frame, style="Modern.TFrame")
         input_frame.pack(fill=tk.X)
@@ -201,14 +311,15 @@ class CommandEchoGUI:
         self.text_input.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
         self.text_input.bind("<Return>", self.send_text_message)
         
-        # Send button
-        send_btn = ttk.Button(
+        # Send button (enabled once the assistant is ready)
+        self.send_btn = ttk.Button(
             input_frame,
             text="Send",
             style="Modern.TButton",
-            command=self.send_text_message
+            command=self.send_text_message,
+            state=tk.DISABLED
         )
-        send_btn.pack(side=tk.RIGHT)
+        self.send_btn.pack(side=tk.RIGHT)
     
     def setup_control_panel(self, parent):
         """Setup control panel"""
@@ -244,12 +355,13 @@ class CommandEchoGUI:
         )
         voice_toggle.pack(pady=5)
         
-        # Listen button
+        # Listen button (enabled once the assistant is ready)
         self.listen_btn = ttk.Button(
             voice_frame,
             text="🎤 Start Listening",
             style="Modern.TButton",
-            command=self.toggle_listening
+            command=self.toggle_listening,
+            state=tk.DISABLED
         )
         self.listen_btn.pack(fill=tk.X, padx=5, pady=2)
         
@@ -285,8 +397,8 @@ class CommandEchoGUI:
         self.model_label = ttk.Label(info_frame, text="Model: Loading...", style="Status.TLabel")
         self.model_label.pack(anchor=tk.W, padx=5, pady=2)
         
-        # Update system info periodically
-        self.update_system_info()
+        # Sample system info periodically off the UI thread
+        threading.Thread(target=self._sysinfo_worker, daemon=True).start()
     
     def setup_settings_controls(self, parent):
         """Setup settings controls"""
@@ -320,38 +432,51 @@ class CommandEchoGUI:
         )
         exit_btn.pack(fill=tk.X, padx=5, pady=2)
     
+    def _block_chat_edit(self, event):
+        """Let copy, select-all and navigation keys through to the chat display"""
+        if event.state & 0x4 and event.keysym.lower() in ('c', 'a'):
+            return None
+        if event.keysym in CHAT_NAVIGATION_KEYS:
+            return None
+        return "break"
+    
     def add_message(self, sender: str, message: str, timestamp: str = None):
         """Add message to chat display"""
-        if timestamp is None:
-            timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        # Color coding
-        if sender.lower() == "you":
-            color = ModernStyle.ACCENT_BLUE
-            prefix = "👤"
-        elif sender.lower() == "commandecho":
-            color = ModernStyle.ACCENT_GREEN
-            prefix = "🤖"
-        else:
-            color = ModernStyle.TEXT_SECONDARY
-            prefix = "ℹ️"
+        self.add_messages([(sender, message, timestamp)])
+    
+    def add_messages(self, entries):
+        """Add (sender, message, timestamp) entries to the chat display in one Text update"""
+        chunks = []
+        for sender, message, timestamp in entries:
+            if timestamp is None:
+                timestamp = self._timestamp()
+            
+            # Color coding; unknown senders are shown like system messages
+            prefix, _, sender_tag = SENDER_META.get(sender.lower(), SENDER_META['system'])
+            
+            # Timestamp and sender, then message content, as (text, tags) pairs
+            chunks.extend((f"[{timestamp}] {prefix} {sender}:\n", ("timestamp", sender_tag), f"{message}\n\n", "message"))
         
-        # Insert message
-        self.chat_display.configure(state=tk.NORMAL)
+        if not chunks:
+            return
         
-        # Add timestamp and sender
-        self.chat_display.insert(tk.END, f"[{timestamp}] {prefix} {sender}:\n", "timestamp")
+        # Insert all messages with a single Tcl insert command
+        self.chat_display.insert(tk.END, *chunks)
         
-        # Add message content
-        self.chat_display.insert(tk.END, f"{message}\n\n", "message")
-        
-        # Configure tags for styling
-        self.chat_display.tag_configure("timestamp", foreground=ModernStyle.TEXT_SECONDARY, font=("Consolas", 9))
-        self.chat_display.tag_configure("message", foreground=ModernStyle.TEXT_PRIMARY)
+        # Trim the oldest lines so the widget does not grow for the whole session
+        lines = int(self.chat_display.index('end-1c').split('.')[0])
+        if lines > MAX_CHAT_LINES:
+            self.chat_display.delete('1.0', f'{lines - MAX_CHAT_LINES}.0')
         
         # Scroll to bottom
         self.chat_display.see(tk.END)
-        self.chat_display.configure(state=tk.DISABLED)
+    
+    def _timestamp(self) -> str:
+        """Current time as HH:MM:SS, formatted at most once per second"""
+        now = int(time.time())
+        if now != self._ts_cache[0]:
+            self._ts_cache = (now, time.strftime('%H:%M:%S', time.localtime(now)))
+        return self._ts_cache[1]
     
     def send_text_message(self, event=None):
         """Send text message"""
@@ -406,6 +531,7 @@ class CommandEchoGUI:
         """Stop listening for voice input"""
         self.is_listening = False
         self.listen_btn.configure(text="🎤 Start Listening")
+        self.voice_level['value'] = 0
         self.update_status("Ready", ModernStyle.ACCENT_BLUE)
         self.add_message("System", "Stopped listening.")
         
@@ -424,33 +550,55 @@ class CommandEchoGUI:
             self.status_label.configure(foreground=color)
         self.status_label.configure(text=f"● {message}")
     
-    def update_system_info(self):
+    def _sysinfo_worker(self):
+        """Worker thread that samples system stats and posts them to the GUI"""
+        # The first non-blocking sample only sets the baseline
+        psutil.cpu_percent(interval=None)
+        
+        failing = False
+        while not self._shutdown.wait(SYSINFO_INTERVAL):
+            if self._minimized:
+                continue
+            
+            try:
+                cpu_percent = psutil.cpu_percent(interval=None)
+                memory_percent = psutil.virtual_memory().percent
+                
+                self.post_message("sysinfo", (cpu_percent, memory_percent))
+                failing = False
+            except Exception as e:
+                # Warn once per run of failures; repeats every interval go to debug
+                log = self.logger.debug if failing else self.logger.warning
+                log(f"Error sampling system info: {e}", exc_info=not failing)
+                failing = True
+    
+    def update_system_info(self, cpu_percent: float, memory_percent: float):
         """Update system information display"""
+        self.cpu_label.configure(text=f"CPU: {cpu_percent:.1f}%")
+        self.memory_label.configure(text=f"Memory: {memory_percent:.1f}%")
+    
+    def update_voice_level(self, level: int):
+        """Update voice level indicator"""
+        self.voice_level['value'] = level if self.is_listening else 0
+    
+    def load_config_dict(self) -> dict:
+        """Return the settings dict, reloading it only if the config file changed"""
         try:
-            import psutil
-            
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=None)
-            self.cpu_label.configure(text=f"CPU: {cpu_percent:.1f}%")
-            
-            # Memory usage
-            memory = psutil.virtual_memory()
-            memory_percent = memory.percent
-            self.memory_label.configure(text=f"Memory: {memory_percent:.1f}%")
-            
-            # Update voice level (simulate for now)
-            if self.is_listening:
-                import random
-                level = random.randint(10, 90)
-                self.voice_level['value'] = level
-            else:
-                self.voice_level['value'] = 0
-            
-        except Exception as e:
-            pass
+            mtime = os.stat(CONFIG_PATH).st_mtime
+        except OSError:
+            return self.config_dict
+        
+        if mtime != self._config_mtime:
+            with open(CONFIG_PATH, 'r') as f:
+                self.config_dict = json.load(f)
+            self._config_mtime = mtime
         
-        # Schedule next update
-        self.root.after(2000, self.update_system_info)
+        return self.config_dict
+    
+    def store_config_dict(self, config: dict):
+        """Remember settings just written to the config file"""
+        self.config_dict = config
+        self._config_mtime = os.stat(CONFIG_PATH).st_mtime
     
     def open_settings(self):
         """Open settings window"""
@@ -458,121 +606,177 @@ class CommandEchoGUI:
     
     def clear_chat(self):
         """Clear chat display"""
-        self.chat_display.configure(state=tk.NORMAL)
         self.chat_display.delete(1.0, tk.END)
-        self.chat_display.configure(state=tk.DISABLED)
         self.add_message("System", "Chat cleared.")
     
     def start_assistant(self):
         """Start the CommandEcho assistant"""
+        # Loading the model takes a while, so it happens off the UI thread
+        self.update_status("Loading assistant...", ModernStyle.ACCENT_ORANGE)
+        threading.Thread(target=self._init_assistant, daemon=True).start()
+    
+    def _init_assistant(self):
+        """Create the assistant in a background thread and hand it to the GUI"""
         try:
             from core.assistant import CommandEcho
             from core.config import Config
             
             # Initialize assistant
             config = Config()
-            self.assistant = CommandEcho(config, text_mode=True)  # Start in text mode for GUI
-            
-            # Start assistant thread
-            self.assistant_thread = threading.Thread(target=self.run_assistant, daemon=True)
-            self.assistant_thread.start()
-            
-            self.add_message("System", "CommandEcho assistant started successfully!")
-            self.update_status("Assistant ready", ModernStyle.ACCENT_GREEN)
+            assistant = CommandEcho(config, text_mode=True)  # Start in text mode for GUI
+            self.post_message("assistant_ready", assistant)
             
         except Exception as e:
-            self.add_message("System", f"Failed to start assistant: {str(e)}")
-            self.update_status("Assistant failed", ModernStyle.ACCENT_RED)
+            self.post_message("assistant_failed", str(e))
+    
+    def _on_assistant_ready(self, assistant):
+        """Install the loaded assistant and enable the controls that need it"""
+        self.assistant = assistant
+        
+        # Drive the voice level meter from captured microphone audio
+        if self.assistant.voice_input:
+            self.assistant.voice_input.level_callback = lambda level: self.post_message("voice_level", level)
+        
+        # Start assistant thread
+        self.assistant_thread = threading.Thread(target=self.run_assistant, daemon=True)
+        self.assistant_thread.start()
+        
+        self.send_btn.configure(state=tk.NORMAL)
+        self.listen_btn.configure(state=tk.NORMAL)
+        
+        self.add_message("System", "CommandEcho assistant started successfully!")
+        self.update_status("Assistant ready", ModernStyle.ACCENT_GREEN)
     
     def run_assistant(self):
         """Run assistant in background thread"""
         # This would integrate with the actual assistant
         # For now, simulate responses
-        while True:
+        while not self._shutdown.is_set():
             try:
-                # Check for commands from GUI
+                # Block until the GUI sends a command; the timeout rechecks shutdown
                 try:
-                    command_type, data = self.command_queue.get_nowait()
-                    
-                    if command_type == "text_input":
-                        # Process text input
-                        response = self.process_command(data)
-                        self.message_queue.put(("assistant_response", response))
-                    
-                    elif command_type == "start_listening":
-                        # Start voice listening
-                        pass
-                    
-                    elif command_type == "stop_listening":
-                        # Stop voice listening
-                        pass
-                    
-                    elif command_type == "stop_speaking":
-                        # Stop speaking
-                        pass
-                        
+                    command_type, data = self.command_queue.get(timeout=1.0)
                 except queue.Empty:
+                    continue
+                
+                if command_type == "text_input":
+                    # Process text input
+                    response = self.process_command(data)
+                    self.post_message("assistant_response", response)
+                
+                elif command_type == "start_listening":
+                    # Start voice listening
+                    pass
+                
+                elif command_type == "stop_listening":
+                    # Stop voice listening
                     pass
                 
-                time.sleep(0.1)
+                elif command_type == "stop_speaking":
+                    # Stop speaking
+                    pass
+                
+                elif command_type == "shutdown":
+                    # Window is closing
+                    return
                 
             except Exception as e:
-                self.message_queue.put(("error", str(e)))
+                self.post_message("error", str(e))
     
     def process_command(self, command: str) -> str:
         """Process command and return response"""
         # This would integrate with the actual CommandEcho brain
         # For now, provide simple responses
         
-        command_lower = command.lower()
+        match = _INTENT_RE.search(command)
+        intent = match.lastgroup if match else None
         
-        if any(greeting in command_lower for greeting in ['hello', 'hi', 'hey']):
+        if intent == 'greet':
             return "Hello! I'm CommandEcho, your AI assistant. How can I help you today?"
         
-        elif 'time' in command_lower:
-            from datetime import datetime
+        elif intent == 'time':
             current_time = datetime.now().strftime("%I:%M %p")
             return f"The current time is {current_time}."
         
-        elif 'weather' in command_lower:
+        elif intent == 'weather':
             return "I don't have access to current weather data, but you can check your local weather app."
         
-        elif any(thanks in command_lower for thanks in ['thank you', 'thanks']):
+        elif intent == 'thanks':
             return "You're welcome! I'm here to help whenever you need assistance."
         
         else:
             return f"I understand you said: '{command}'. I'm processing your request..."
     
-    def update_gui(self):
-        """Update GUI with messages from assistant"""
+    def post_message(self, message_type: str, data):
+        """Queue a message for the GUI and wake the UI thread to show it"""
+        self._msg_deque.append((message_type, data))
+        self._msg_event.set()
+        if self._drain_pending:
+            return
+        
+        # Runs once pending input events are handled, ahead of no other work
+        self._drain_pending = True
+        try:
+            self.root.after_idle(self._drain_messages)
+        except (RuntimeError, tk.TclError):
+            self._drain_pending = False  # Interpreter not reachable from this thread; the heartbeat drains it
+    
+    def _drain_messages(self):
+        """Show all messages currently queued by the assistant"""
+        # Cleared before draining so a message posted meanwhile schedules a new drain
+        self._drain_pending = False
+        self._msg_event.clear()
+        entries = []
         try:
-            # Process messages from assistant
             while True:
                 try:
-                    message_type, data = self.message_queue.get_nowait()
+                    message_type, data = self._msg_deque.popleft()
                     
                     if message_type == "assistant_response":
-                        self.add_message("CommandEcho", data)
+                        entries.append(("CommandEcho", data, None))
                     
                     elif message_type == "error":
-                        self.add_message("System", f"Error: {data}")
+                        entries.append(("System", f"Error: {data}", None))
                     
                     elif message_type == "status_update":
                         self.update_status(data)
+                    
+                    elif message_type == "sysinfo":
+                        self.update_system_info(*data)
+                    
+                    elif message_type == "voice_level":
+                        self.update_voice_level(data)
+                    
+                    elif message_type == "assistant_ready":
+                        self._on_assistant_ready(data)
+                    
+                    elif message_type == "assistant_failed":
+                        entries.append(("System", f"Failed to start assistant: {data}", None))
+                        self.update_status("Assistant failed", ModernStyle.ACCENT_RED)
                         
-                except queue.Empty:
+                except IndexError:
                     break
             
+            # Chat messages from this drain go into the display together
+            self.add_messages(entries)
+            
         except Exception as e:
             pass
+    
+    def update_gui(self):
+        """Low-frequency fallback drain for messages that were not pushed"""
+        if self._msg_event.is_set():
+            self._drain_messages()
         
-        # Schedule next update
-        self.root.after(100, self.update_gui)
+        # Schedule next heartbeat
+        self.root.after(1000, self.update_gui)
     
     def on_closing(self):
         """Handle window closing"""
         if messagebox.askokcancel("Quit", "Do you want to quit CommandEcho?"):
             # Stop assistant
+            # Stop background workers; the sentinel wakes run_assistant immediately
+            self._shutdown.set()
             if self.assistant:
                 self.command_queue.put(("shutdown", None))
             
@@ -605,10 +809,65 @@ class SettingsWindow:
         self.window.configure(bg=ModernStyle.BG_DARK)
         self.window.transient(parent)
         self.window.grab_set()
+        self.window.protocol("WM_DELETE_WINDOW", self._destroy)
+        
+        # Tk variables created for the controls, released on close
+        self._vars = []
+        
+        # Pending after() ids by debounce key
+        self._after_ids = {}
+        
+        # Scale readouts: key -> (label, text, variable, value format)
+        self._scale_labels = {}
         
         self.setup_settings_gui()
         self.load_current_settings()
     
+    def _new_var(self, var_class, value=None):
+        """Create a Tk variable owned by this window"""
+        var = var_class(self.window, value=value)
+        self._vars.append(var)
+        return var
+    
+    def _destroy(self):
+        """Close the window and release its Tk variables"""
+        try:
+            for after_id in self._after_ids.values():
+                self.window.after_cancel(after_id)
+            self._after_ids.clear()
+            
+            # Dropping the last references unsets the Tcl variables
+            self._vars.clear()
+            self._scale_labels.clear()
+            for name in [name for name, value in vars(self).items() if isinstance(value, tk.Variable)]:
+                delattr(self, name)
+            
+            self.main_app = None
+        finally:
+            self.window.destroy()
+    
+    def _debounce(self, key: str, fn, ms: int = SCALE_DEBOUNCE_MS):
+        """Run fn once ms after the last call with the same key"""
+        after_id = self._after_ids.pop(key, None)
+        if after_id is not None:
+            self.window.after_cancel(after_id)
+        
+        def run():
+            self._after_ids.pop(key, None)
+            fn()
+        
+        self._after_ids[key] = self.window.after(ms, run)
+    
+    def _update_scale_label(self, key: str):
+        """Show a scale's current value in its label"""
+        label, text, var, fmt = self._scale_labels[key]
+        label.configure(text=f"{text}: {fmt.format(var.get())}")
+    
+    def _update_scale_labels(self):
+        """Show every scale's current value in its label"""
+        for key in self._scale_labels:
+            self._update_scale_label(key)
+    
     def setup_settings_gui(self):
         """Setup settings GUI"""
         # Main frame
@@ -638,12 +897,12 @@ class SettingsWindow:
         
         # Wake word
         ttk.Label(voice_frame, text="Wake Word:").pack(anchor=tk.W, padx=5, pady=2)
-        self.wake_word_var = tk.StringVar(value="echo")
+        self.wake_word_var = self._new_var(tk.StringVar, value="echo")
         wake_word_entry = ttk.Entry(voice_frame, textvariable=self.wake_word_var)
         wake_word_entry.pack(fill=tk.X, padx=5, pady=2)
         
         # Always listening
-        self.always_listening_var = tk.BooleanVar()
+        self.always_listening_var = self._new_var(tk.BooleanVar)
         always_listening_cb = ttk.Checkbutton(
             voice_frame,
             text="Always Listening (no wake word needed)",
@@ -652,26 +911,32 @@ class SettingsWindow:
         always_listening_cb.pack(anchor=tk.W, padx=5, pady=5)
         
         # Speech rate
-        ttk.Label(voice_frame, text="Speech Rate:").pack(anchor=tk.W, padx=5, pady=2)
-        self.speech_rate_var = tk.IntVar(value=200)
+        self.speech_rate_var = self._new_var(tk.IntVar, value=200)
+        speech_rate_label = ttk.Label(voice_frame, text="Speech Rate:")
+        speech_rate_label.pack(anchor=tk.W, padx=5, pady=2)
+        self._scale_labels['speech_rate'] = (speech_rate_label, "Speech Rate", self.speech_rate_var, "{:.0f}")
         speech_rate_scale = ttk.Scale(
             voice_frame,
             from_=100,
             to=300,
             variable=self.speech_rate_var,
-            orient=tk.HORIZONTAL
+            orient=tk.HORIZONTAL,
+            command=lambda v: self._debounce('speech_rate', lambda: self._update_scale_label('speech_rate'))
         )
         speech_rate_scale.pack(fill=tk.X, padx=5, pady=2)
         
         # Volume
-        ttk.Label(voice_frame, text="Speech Volume:").pack(anchor=tk.W, padx=5, pady=2)
-        self.speech_volume_var = tk.DoubleVar(value=0.9)
+        self.speech_volume_var = self._new_var(tk.DoubleVar, value=0.9)
+        speech_volume_label = ttk.Label(voice_frame, text="Speech Volume:")
+        speech_volume_label.pack(anchor=tk.W, padx=5, pady=2)
+        self._scale_labels['speech_volume'] = (speech_volume_label, "Speech Volume", self.speech_volume_var, "{:.2f}")
         volume_scale = ttk.Scale(
             voice_frame,
             from_=0.0,
             to=1.0,
             variable=self.speech_volume_var,
-            orient=tk.HORIZONTAL
+            orient=tk.HORIZONTAL,
+            command=lambda v: self._debounce('speech_volume', lambda: self._update_scale_label('speech_volume'))
         )
         volume_scale.pack(fill=tk.X, padx=5, pady=2)
     
@@ -682,31 +947,37 @@ class SettingsWindow:
         
         # Model path
         ttk.Label(ai_frame, text="Model Path:").pack(anchor=tk.W, padx=5, pady=2)
-        self.model_path_var = tk.StringVar(value="models/llama-3-8b-instruct.Q4_K_M.gguf")
+        self.model_path_var = self._new_var(tk.StringVar, value="models/llama-3-8b-instruct.Q4_K_M.gguf")
         model_path_entry = ttk.Entry(ai_frame, textvariable=self.model_path_var)
         model_path_entry.pack(fill=tk.X, padx=5, pady=2)
         
         # Temperature
-        ttk.Label(ai_frame, text="Temperature (Creativity):").pack(anchor=tk.W, padx=5, pady=2)
-        self.temperature_var = tk.DoubleVar(value=0.7)
+        self.temperature_var = self._new_var(tk.DoubleVar, value=0.7)
+        temperature_label = ttk.Label(ai_frame, text="Temperature (Creativity):")
+        temperature_label.pack(anchor=tk.W, padx=5, pady=2)
+        self._scale_labels['temperature'] = (temperature_label, "Temperature (Creativity)", self.temperature_var, "{:.2f}")
         temp_scale = ttk.Scale(
             ai_frame,
             from_=0.1,
             to=1.0,
             variable=self.temperature_var,
-            orient=tk.HORIZONTAL
+            orient=tk.HORIZONTAL,
+            command=lambda v: self._debounce('temperature', lambda: self._update_scale_label('temperature'))
         )
         temp_scale.pack(fill=tk.X, padx=5, pady=2)
         
         # Max tokens
-        ttk.Label(ai_frame, text="Max Response Length:").pack(anchor=tk.W, padx=5, pady=2)
-        self.max_tokens_var = tk.IntVar(value=512)
+        self.max_tokens_var = self._new_var(tk.IntVar, value=512)
+        max_tokens_label = ttk.Label(ai_frame, text="Max Response Length:")
+        max_tokens_label.pack(anchor=tk.W, padx=5, pady=2)
+        self._scale_labels['max_tokens'] = (max_tokens_label, "Max Response Length", self.max_tokens_var, "{:.0f}")
         tokens_scale = ttk.Scale(
             ai_frame,
             from_=128,
             to=2048,
             variable=self.max_tokens_var,
-            orient=tk.HORIZONTAL
+            orient=tk.HORIZONTAL,
+            command=lambda v: self._debounce('max_tokens', lambda: self._update_scale_label('max_tokens'))
         )
         tokens_scale.pack(fill=tk.X, padx=5, pady=2)
     
@@ -716,14 +987,17 @@ class SettingsWindow:
         memory_frame.pack(fill=tk.X, pady=(0, 10))
         
         # Short-term memory limit
-        ttk.Label(memory_frame, text="Short-term Memory Limit:").pack(anchor=tk.W, padx=5, pady=2)
-        self.memory_limit_var = tk.IntVar(value=10)
+        self.memory_limit_var = self._new_var(tk.IntVar, value=10)
+        memory_limit_label = ttk.Label(memory_frame, text="Short-term Memory Limit:")
+        memory_limit_label.pack(anchor=tk.W, padx=5, pady=2)
+        self._scale_labels['memory_limit'] = (memory_limit_label, "Short-term Memory Limit", self.memory_limit_var, "{:.0f}")
         memory_scale = ttk.Scale(
             memory_frame,
             from_=5,
             to=50,
             variable=self.memory_limit_var,
-            orient=tk.HORIZONTAL
+            orient=tk.HORIZONTAL,
+            command=lambda v: self._debounce('memory_limit', lambda: self._update_scale_label('memory_limit'))
         )
         memory_scale.pack(fill=tk.X, padx=5, pady=2)
         
@@ -752,7 +1026,7 @@ class SettingsWindow:
         cancel_btn = ttk.Button(
             button_frame,
             text="Cancel",
-            command=self.window.destroy
+            command=self._destroy
         )
         cancel_btn.pack(side=tk.LEFT, padx=5)
         
@@ -767,27 +1041,12 @@ class SettingsWindow:
     def load_current_settings(self):
         """Load current settings from config"""
         try:
-            config_path = Path("config/config.json")
-            if config_path.exists():
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-                
-                # Load voice settings
-                voice_config = config.get('voice', {})
-                self.wake_word_var.set(voice_config.get('wake_word', 'echo'))
-                self.always_listening_var.set(voice_config.get('always_listening', False))
-                self.speech_rate_var.set(voice_config.get('speech_rate', 200))
-                self.speech_volume_var.set(voice_config.get('speech_volume', 0.9))
-                
-                # Load AI settings
-                llm_config = config.get('llm', {})
-                self.model_path_var.set(llm_config.get('model_path', 'models/llama-3-8b-instruct.Q4_K_M.gguf'))
-                self.temperature_var.set(llm_config.get('temperature', 0.7))
-                self.max_tokens_var.set(llm_config.get('max_tokens', 512))
-                
-                # Load memory settings
-                memory_config = config.get('memory', {})
-                self.memory_limit_var.set(memory_config.get('max_short_term_memory', 10))
+            config = self.main_app.load_config_dict()
+            if config:
+                for attr, section, key, default in SETTINGS_FIELDS:
+                    getattr(self, attr).set(config.get(section, {}).get(key, default))
+            
+            self._update_scale_labels()
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load settings: {e}")
@@ -795,53 +1054,38 @@ class SettingsWindow:
     def save_settings(self):
         """Save settings to config file"""
         try:
-            config = {
-                'voice': {
-                    'wake_word': self.wake_word_var.get(),
-                    'always_listening': self.always_listening_var.get(),
-                    'speech_rate': self.speech_rate_var.get(),
-                    'speech_volume': self.speech_volume_var.get(),
-                    'voice_id': 0
-                },
-                'llm': {
-                    'model_path': self.model_path_var.get(),
-                    'context_length': 4096,
-                    'max_tokens': self.max_tokens_var.get(),
-                    'temperature': self.temperature_var.get(),
-                    'top_p': 0.9
-                },
-                'memory': {
-                    'memory_db_path': 'data/memory/memory.db',
-                    'vector_db_path': 'data/memory/vectors',
-                    'max_short_term_memory': self.memory_limit_var.get(),
-                    'embedding_model': 'all-MiniLM-L6-v2'
-                }
-            }
+            # Start from the current settings so fields without a control are kept
+            current = self.main_app.load_config_dict()
+            config = {section: dict(values) for section, values in current.items()}
             
-            # Save to file
-            config_path = Path("config/config.json")
-            config_path.parent.mkdir(exist_ok=True)
+            for attr, section, key, _ in SETTINGS_FIELDS:
+                config.setdefault(section, {})[key] = getattr(self, attr).get()
             
-            with open(config_path, 'w') as f:
-                json.dump(config, f, indent=2)
+            # Save to file, skipping the write if nothing changed
+            CONFIG_PATH.parent.mkdir(exist_ok=True)
+            
+            new_text = json.dumps(config, indent=2, separators=(',', ': '))
+            if not CONFIG_PATH.exists() or CONFIG_PATH.read_text() != new_text:
+                # Write to a temporary file and swap it in so a partial write never replaces the config
+                tmp_path = CONFIG_PATH.with_name(CONFIG_PATH.name + ".tmp")
+                tmp_path.write_text(new_text)
+                os.replace(tmp_path, CONFIG_PATH)
+            self.main_app.store_config_dict(config)
             
             messagebox.showinfo("Success", "Settings saved successfully!")
-            self.window.destroy()
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save settings: {e}")
+        else:
+            # Outside the try so a problem closing the window is not reported as a failed save
+            self._destroy()
     
     def reset_settings(self):
         """Reset settings to defaults"""
         if messagebox.askyesno("Reset Settings", "Are you sure you want to reset all settings to defaults?"):
-            self.wake_word_var.set("echo")
-            self.always_listening_var.set(False)
-            self.speech_rate_var.set(200)
-            self.speech_volume_var.set(0.9)
-            self.model_path_var.set("models/llama-3-8b-instruct.Q4_K_M.gguf")
-            self.temperature_var.set(0.7)
-            self.max_tokens_var.set(512)
-            self.memory_limit_var.set(10)
+            for attr, _, _, default in SETTINGS_FIELDS:
+                getattr(self, attr).set(default)
+            self._update_scale_labels()
 
 def main():
     """Run the GUI application"""
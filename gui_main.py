@@ -7,14 +7,15 @@ import sys
 import os
 from pathlib import Path
 
-# Add project root to path
-project_root = Path(__file__).parent
-sys.path.insert(0, str(project_root))
-
 def main():
     """Launch CommandEcho GUI"""
     try:
-        from gui.main_window import main as gui_main
+        try:
+            from gui.main_window import main as gui_main
+        except ImportError:
+            # Started from outside the project directory; add the project root to path
+            sys.path.insert(0, str(Path(__file__).parent))
+            from gui.main_window import main as gui_main
         gui_main()
     except ImportError as e:
         print(f"Error importing GUI components: {e}")
@@ -2,20 +2,45 @@
 Simple launcher script for CommandEcho
 """
 
+import os
 import sys
 import subprocess
 from pathlib import Path
 
+# Line editing for the menu prompt (not available on Windows)
+try:
+    import readline
+except ImportError:
+    pass
+
+MENU = (
+    "🤖 CommandEcho Launcher\n"
+    + "=" * 30 + "\n"
+    "1. GUI Mode (Graphical Interface)\n"
+    "2. Text Mode (Terminal)\n"
+    "3. Voice Mode (Full Voice)\n"
+    "4. Run Tests\n"
+    "5. Setup\n"
+    "6. Exit\n"
+)
+
+def run_script(*args):
+    """Replace this process with a Python process running the given script"""
+    command = [sys.executable, *args]
+    if os.name == "nt":
+        # exec on Windows starts a new process and returns the console to the
+        # shell right away, so wait for the child instead
+        sys.exit(subprocess.call(command))
+    
+    # exec discards Python's output buffers along with the process
+    sys.stdout.flush()
+    os.execv(sys.executable, command)
+
 def main():
     """Launch CommandEcho with options"""
-    print("🤖 CommandEcho Launcher")
-    print("=" * 30)
-    print("1. GUI Mode (Graphical Interface)")
-    print("2. Text Mode (Terminal)")
-    print("3. Voice Mode (Full Voice)")
-    print("4. Run Tests")
-    print("5. Setup")
-    print("6. Exit")
+    # Whole menu in a single write
+    sys.stdout.write(MENU)
+    sys.stdout.flush()
     
     while True:
         try:
@@ -23,28 +48,23 @@ def main():
             
             if choice == "1":
                 print("Starting CommandEcho GUI...")
-                subprocess.run([sys.executable, "gui_main.py"])
-                break
+                run_script("gui_main.py")
             
             elif choice == "2":
                 print("Starting CommandEcho in text mode...")
-                subprocess.run([sys.executable, "main.py", "--text-mode"])
-                break
+                run_script("main.py", "--text-mode")
             
             elif choice == "3":
                 print("Starting CommandEcho in voice mode...")
-                subprocess.run([sys.executable, "main.py"])
-                break
+                run_script("main.py")
             
             elif choice == "4":
                 print("Running installation tests...")
-                subprocess.run([sys.executable, "test_installation.py"])
-                break
+                run_script("test_installation.py")
             
             elif choice == "5":
                 print("Running setup...")
-                subprocess.run([sys.executable, "setup.py"])
-                break
+                run_script("setup.py")
             
             elif choice == "6":
                 print("Goodbye!")
@@ -1,15 +1,49 @@
 # main.py
 
-from voice.listener import VoiceListener
-from voice.speaker import VoiceSpeaker
-from brain.memory import init_memory
-from brain.logic import process_command
+import argparse
+import queue
+import threading
 
-def main():
-    init_memory()  # ← Initializes memory on startup
-    listener = VoiceListener()
-    speaker = VoiceSpeaker()
+# While a reply plays, a partial only counts as the user talking over it once it has
+# this many words in BARGE_IN_PARTIALS successive hypotheses; noise and echo rarely do
+BARGE_IN_MIN_WORDS = 2
+BARGE_IN_PARTIALS = 2
+
+def speech_worker(speaker, tts_queue, done):
+    # Speak responses as they arrive so the main loop can listen again right away
+    for generation, text in iter(tts_queue.get, None):
+        speaker.speak(text, generation)
+    done.set()
 
+def interrupt(speaker, tts_queue):
+    # Cut off the reply being spoken and drop the ones still waiting to be spoken
+    speaker.stop()
+    while True:
+        try:
+            tts_queue.get_nowait()
+        except queue.Empty:
+            break
+
+def text_loop(process_command):
+    # Typed commands; the voice stack is never imported
+    while True:
+        try:
+            command = input("⌨️ You: ").strip()
+        except (EOFError, KeyboardInterrupt):
+            break
+
+        if command:
+            response = process_command(command)
+
+            if response == "exit":
+                print("Goodbye Manish.")
+                break
+
+            print(response)
+
+def voice_loop(listener, speaker, process_command):
+    # Listen, then reply; the microphone is closed while the reply plays, so the
+    # recognizer never hears the assistant's own voice
     while True:
         print("🕒 Waiting for your voice input...")
         command = listener.listen()
@@ -17,12 +51,81 @@ def main():
         if command:
             print(f"🗣️ You said: {command}")
             response = process_command(command)
-            
+
             if response == "exit":
                 speaker.speak("Goodbye Manish.")
                 break
 
             speaker.speak(response)
 
+def barge_in_loop(listener, speaker, process_command):
+    # Keep listening while replies play so a new command can cut them off. Nothing
+    # cancels echo, so this is only safe when the speakers cannot reach the microphone
+    tts_queue = queue.Queue()
+    speech_done = threading.Event()
+    threading.Thread(target=speech_worker, args=(speaker, tts_queue, speech_done), daemon=True).start()
+
+    while True:
+        print("🕒 Waiting for your voice input...")
+        command = ""
+        heard = 0  # Successive partials long enough to be the user speaking
+        for kind, text in listener.listen_stream():
+            long_enough = len(text.split()) >= BARGE_IN_MIN_WORDS
+            if kind == "final":
+                # Short results heard during playback are mostly noise or echo
+                if long_enough or not speaker.speaking.is_set():
+                    command = text
+            elif speaker.speaking.is_set():
+                heard = heard + 1 if long_enough else 0
+                if heard >= BARGE_IN_PARTIALS:
+                    # Barge-in: the user is talking over the reply
+                    interrupt(speaker, tts_queue)
+                    heard = 0
+
+        if command:
+            # The new command supersedes anything still playing or queued
+            interrupt(speaker, tts_queue)
+
+            print(f"🗣️ You said: {command}")
+            response = process_command(command)
+            
+            if response == "exit":
+                # Let the goodbye play out before the process exits
+                tts_queue.put((speaker.generation, "Goodbye Manish."))
+                tts_queue.put(None)
+                speech_done.wait()
+                break
+
+            # Tag the reply with the current generation; a later stop() skips it
+            tts_queue.put((speaker.generation, response))
+
+def main():
+    parser = argparse.ArgumentParser(description="CommandEcho assistant")
+    parser.add_argument("--text-mode", action="store_true", help="type commands instead of speaking them")
+    parser.add_argument("--barge-in", action="store_true",
+                        help="keep listening while replies play so speaking interrupts them (use headphones)")
+    args = parser.parse_args()
+
+    from brain.memory import init_memory
+    from brain.logic import process_command
+
+    init_memory()  # ← Initializes memory on startup
+
+    if args.text_mode:
+        text_loop(process_command)
+        return
+
+    # TTS and speech recognition are only loaded for voice mode
+    from voice.listener import VoiceListener
+    from voice.speaker import VoiceSpeaker
+
+    listener = VoiceListener()
+    speaker = VoiceSpeaker()
+
+    if args.barge_in:
+        barge_in_loop(listener, speaker, process_command)
+    else:
+        voice_loop(listener, speaker, process_command)
+
 if __name__ == "__main__":
     main()
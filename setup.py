@@ -3,11 +3,27 @@ Setup script for CommandEcho
 Helps with initial setup and dependency checking
 """
 
+import hashlib
 import os
 import sys
 import subprocess
 from pathlib import Path
 
+from utils.helpers import existing_directories
+
+# Hash of the requirements last installed by this interpreter
+SETUP_CACHE = Path(".setup_cache")
+
+# Platform checks, done once
+_WINDOWS = os.name == 'nt'
+_POSIX = os.name == 'posix'
+
+# Size of the chunks pip's output is copied to stdout in
+OUTPUT_CHUNK_SIZE = 64 * 1024
+
+# Reuse cached wheels and never stop to prompt
+PIP_INSTALL_FLAGS = ["--prefer-binary", "--no-input", "--disable-pip-version-check"]
+
 def check_python_version():
     """Check if Python version is compatible"""
     if sys.version_info < (3, 8):
@@ -16,12 +32,42 @@ def check_python_version():
     print(f"✅ Python {sys.version.split()[0]} detected")
     return True
 
+def _requirements_state():
+    """Key for the installed requirements: this interpreter plus the requirements file hash"""
+    digest = hashlib.sha256(Path("requirements.txt").read_bytes()).hexdigest()
+    return f"{sys.executable}:{digest}"
+
+def run_buffered(command):
+    """Run a command, copying its output to stdout in large chunks"""
+    sys.stdout.flush()
+    out = sys.stdout.buffer
+    
+    with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT) as proc:
+        for chunk in iter(lambda: proc.stdout.read1(OUTPUT_CHUNK_SIZE), b""):
+            out.write(chunk)
+    
+    out.flush()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, command)
+
 def install_dependencies():
     """Install required dependencies"""
+    # Skip pip entirely if these requirements were installed before and are still consistent
+    state = _requirements_state()
+    if SETUP_CACHE.exists() and SETUP_CACHE.read_text() == state:
+        check = subprocess.run(
+            [sys.executable, "-m", "pip", "check", "--disable-pip-version-check"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        if check.returncode == 0:
+            print("✅ Dependencies already installed")
+            return True
+    
     print("Installing dependencies...")
     
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+        run_buffered([sys.executable, "-m", "pip", "install", *PIP_INSTALL_FLAGS, "-r", "requirements.txt"])
+        SETUP_CACHE.write_text(state)
         print("✅ Dependencies installed successfully")
         return True
     except subprocess.CalledProcessError as e:
@@ -37,8 +83,11 @@ def create_directories():
         "logs"
     ]
     
+    # One listing per parent directory, then mkdir only what is missing
+    existing = existing_directories(directories)
     for directory in directories:
-        Path(directory).mkdir(parents=True, exist_ok=True)
+        if directory not in existing:
+            os.makedirs(directory, exist_ok=True)
         print(f"✅ Created directory: {directory}")
 
 def download_model_instructions():
@@ -64,18 +113,20 @@ def setup_audio():
     """Setup audio dependencies"""
     print("\n🎤 Setting up audio...")
     
-    system = os.name
-    if system == 'nt':  # Windows
+    if _WINDOWS:  # Windows
         print("For Windows, you may need to install:")
         print("- Microsoft Visual C++ Redistributable")
         print("- Windows SDK (for PyAudio)")
-    elif system == 'posix':  # Linux/macOS
+    elif _POSIX:  # Linux/macOS
         print("For Linux, you may need to install:")
         print("- sudo apt-get install portaudio19-dev python3-pyaudio")
         print("- sudo apt-get install espeak espeak-data libespeak1 libespeak-dev")
 
 def main():
     """Main setup function"""
+    # Collect output and write it out at the end of each step
+    sys.stdout.reconfigure(line_buffering=False, write_through=False)
+    
     print("🤖 CommandEcho Setup")
     print("="*30)
     
@@ -85,17 +136,20 @@ def main():
     
     # Create directories
     create_directories()
+    sys.stdout.flush()
     
     # Install dependencies
     if not install_dependencies():
         print("Setup failed. Please install dependencies manually.")
         return
+    sys.stdout.flush()
     
     # Setup audio
     setup_audio()
     
     # Model download instructions
     download_model_instructions()
+    sys.stdout.flush()
     
     print("\n✅ Setup completed!")
     print("\nNext steps:")
@@ -1,17 +1,23 @@
 import os
 import platform
+import re
+
+HOME = os.path.expanduser("~")
+
+# The platform cannot change while running
+_IS_WINDOWS = platform.system() == "Windows"
 
 # Mapping of common folders to their absolute paths
-FOLDER_MAP = {
-    "downloads": os.path.join(os.path.expanduser("~"), "Downloads"),
-    "documents": os.path.join(os.path.expanduser("~"), "Documents"),
-    "desktop": os.path.join(os.path.expanduser("~"), "Desktop"),
-    "pictures": os.path.join(os.path.expanduser("~"), "Pictures"),
+_RAW_FOLDER_MAP = {
+    "downloads": os.path.join(HOME, "Downloads"),
+    "documents": os.path.join(HOME, "Documents"),
+    "desktop": os.path.join(HOME, "Desktop"),
+    "pictures": os.path.join(HOME, "Pictures"),
     # Add more folders if needed
 }
 
 # Mapping of applications to their paths
-APP_PATHS = {
+_RAW_APP_PATHS = {
     "chrome": "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
     "vscode": "C:\\Users\\%USERNAME%\\AppData\\Local\\Programs\\Microsoft VS Code\\Code.exe",
     "notepad": "notepad.exe",
@@ -19,16 +25,27 @@ APP_PATHS = {
     # Add more apps here
 }
 
+# Lowercase names and fully expanded paths, resolved once at import
+FOLDER_MAP = {name.lower(): path for name, path in _RAW_FOLDER_MAP.items()}
+APP_PATHS = {name.lower(): os.path.expandvars(path) for name, path in _RAW_APP_PATHS.items()}
+
+# All folder names in one pattern, so a command is scanned once
+_FOLDER_RE = re.compile(r'\b(' + '|'.join(map(re.escape, FOLDER_MAP)) + r')\b', re.I)
+
+# Names of folders known to exist, filled on the first open_folder call;
+# folders missing then are checked again when asked for
+_VALID = None
+
 def open_application(app_name: str) -> str:
     try:
-        if platform.system() != "Windows":
+        if not _IS_WINDOWS:
             return "System control currently supports only Windows."
 
         app_name = app_name.lower().strip()
         path = APP_PATHS.get(app_name)
 
         if path:
-            os.startfile(os.path.expandvars(path))
+            os.startfile(path)
             return f"{app_name.capitalize()} is opening..."
         else:
             return f"Sorry, I don’t know how to open '{app_name}'."
@@ -36,14 +53,21 @@ def open_application(app_name: str) -> str:
         return f"Failed to open '{app_name}': {str(e)}"
 
 def open_folder(command: str) -> str:
+    global _VALID
     command = command.lower().strip()
 
-    for folder_name, path in FOLDER_MAP.items():
-        if folder_name in command:
-            if os.path.exists(path):
-                os.startfile(path)
-                return f"{folder_name.capitalize()} folder is now open."
-            else:
-                return f"{folder_name.capitalize()} folder path does not exist."
+    if _VALID is None:
+        _VALID = {name for name, path in FOLDER_MAP.items() if os.path.isdir(path)}
+
+    m = _FOLDER_RE.search(command)
+    if m:
+        folder_name = m.group(1).lower()
+        path = FOLDER_MAP[folder_name]
+        if folder_name in _VALID or os.path.isdir(path):
+            _VALID.add(folder_name)
+            os.startfile(path, 'open')
+            return f"{folder_name.capitalize()} folder is now open."
+        else:
+            return f"{folder_name.capitalize()} folder path does not exist."
 
     return f"Sorry, I don’t know how to open '{command}'."
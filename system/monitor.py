@@ -1,18 +1,40 @@
+import time
+
 import psutil
 
-def get_cpu_usage():
-    return psutil.cpu_percent(interval=1)
+# Seconds a sampled value is reused before psutil is asked again
+STATUS_TTL = 0.5
+
+# Latest (value, timestamp) per metric
+_CACHE = {}
+
+# Prime the non-blocking CPU sampler; the first call only sets the baseline
+psutil.cpu_percent(interval=None)
+
+def _cached(key, fn, ttl):
+    now = time.monotonic()
+    entry = _CACHE.get(key)
+    if entry is not None and now - entry[1] < ttl:
+        return entry[0]
+
+    value = fn()
+    _CACHE[key] = (value, now)
+    return value
+
+def get_cpu_usage(ttl=STATUS_TTL):
+    # CPU usage since the previous sample instead of blocking for a 1s interval
+    return _cached('cpu', lambda: psutil.cpu_percent(interval=None), ttl)
 
-def get_ram_usage():
-    return psutil.virtual_memory().percent
+def get_ram_usage(ttl=STATUS_TTL):
+    return _cached('ram', lambda: psutil.virtual_memory().percent, ttl)
 
-def get_disk_usage():
-    return psutil.disk_usage('/').percent
+def get_disk_usage(ttl=STATUS_TTL):
+    return _cached('disk', lambda: psutil.disk_usage('/').percent, ttl)
 
-def system_status(verbose=False):
-    cpu = get_cpu_usage()
-    ram = get_ram_usage()
-    disk = get_disk_usage()
+def system_status(verbose=False, ttl=STATUS_TTL):
+    cpu = get_cpu_usage(ttl)
+    ram = get_ram_usage(ttl)
+    disk = get_disk_usage(ttl)
 
     if verbose:
         return (
@@ -2,21 +2,93 @@
 Test script to verify CommandEcho installation
 """
 
+import argparse
+import functools
+import json
+import site
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from utils.helpers import check_dependencies, get_system_info, validate_model_file
+from utils.helpers import check_dependencies, existing_directories, get_system_info, validate_model_file
+
+MODEL_PATH = "models/llama-3-8b-instruct.Q4_K_M.gguf"
+
+# Results of the slow checks, reused while nothing they depend on has changed
+INSTALL_CHECK_CACHE = Path("logs/install_check.json")
+
+# Cached results for the current state key; filled in by main()
+_check_cache = {}
+
+def _state_key() -> str:
+    """Describe every input that could change a cached check result"""
+    parts = [sys.version]
+    
+    # Installing or removing a package touches the site-packages directories
+    # (old virtualenv builds of site lack getsitepackages)
+    site_dirs = getattr(site, 'getsitepackages', list)() + [site.getusersitepackages()]
+    for path in ["requirements.txt", MODEL_PATH] + site_dirs:
+        try:
+            stat = os.stat(path)
+            parts.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+        except OSError:
+            parts.append(f"{path}:missing")
+    
+    return "|".join(parts)
+
+def _load_check_cache(force: bool = False):
+    """Load cached check results if they were recorded for the current state"""
+    _check_cache.clear()
+    _check_cache['key'] = _state_key()
+    _check_cache['results'] = {}
+    
+    if force or not INSTALL_CHECK_CACHE.exists():
+        return
+    
+    try:
+        data = json.loads(INSTALL_CHECK_CACHE.read_text())
+        if data.get('key') == _check_cache['key']:
+            _check_cache['results'] = data.get('results', {})
+    except (OSError, ValueError):
+        pass
+
+def _save_check_cache():
+    """Persist the check results for the next run"""
+    try:
+        INSTALL_CHECK_CACHE.parent.mkdir(exist_ok=True)
+        INSTALL_CHECK_CACHE.write_text(json.dumps(_check_cache, indent=2))
+    except OSError:
+        pass
+
+def as_cached(name: str):
+    """Reuse a check's result from the install check cache"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args):
+            if 'results' not in _check_cache:
+                return fn(*args)
+            
+            key = f"{name}:{json.dumps(args)}"
+            results = _check_cache['results']
+            if key not in results:
+                results[key] = fn(*args)
+            return results[key]
+        return wrapper
+    return decorator
+
+cached_check_dependencies = as_cached('dependencies')(check_dependencies)
+cached_validate_model_file = as_cached('model')(validate_model_file)
 
 def test_dependencies():
     """Test if all dependencies are installed"""
     print("🔍 Checking Dependencies...")
     print("-" * 40)
     
-    deps = check_dependencies()
+    deps = cached_check_dependencies()
     all_good = True
     
     for dep, available in deps.items():
@@ -49,10 +121,12 @@ def test_directories():
         "utils"
     ]
     
+    # One listing per parent directory instead of a stat per path
+    existing = existing_directories(required_dirs)
+    
     all_good = True
     for directory in required_dirs:
-        path = Path(directory)
-        if path.exists():
+        if directory in existing:
             print(f"✅ {directory}")
         else:
             print(f"❌ {directory} (missing)")
@@ -71,9 +145,9 @@ def test_model():
     print("\n🤖 Checking AI Model...")
     print("-" * 40)
     
-    model_path = "models/llama-3-8b-instruct.Q4_K_M.gguf"
+    model_path = MODEL_PATH
     
-    if validate_model_file(model_path):
+    if cached_validate_model_file(model_path):
         print(f"✅ Model found: {model_path}")
         return True
     else:
@@ -81,38 +155,54 @@ def test_model():
         print("Please download a LLaMA model in GGUF format")
         return False
 
-def test_voice_system():
-    """Test voice input/output system"""
-    print("\n🎤 Testing Voice System...")
-    print("-" * 40)
-    
-    # Test TTS
+def _probe_pyttsx3():
+    """Initialize the text-to-speech engine"""
     try:
         import pyttsx3
         engine = pyttsx3.init()
-        print("✅ Text-to-Speech engine initialized")
         engine.stop()
+        return True, "✅ Text-to-Speech engine initialized"
     except Exception as e:
-        print(f"❌ Text-to-Speech failed: {e}")
-        return False
-    
-    # Test Speech Recognition
+        return False, f"❌ Text-to-Speech failed: {e}"
+
+def _probe_sr_recognizer():
+    """Create a speech recognizer"""
     try:
         import speech_recognition as sr
-        recognizer = sr.Recognizer()
-        print("✅ Speech Recognition initialized")
+        sr.Recognizer()
+        return True, "✅ Speech Recognition initialized"
     except Exception as e:
-        print(f"❌ Speech Recognition failed: {e}")
-        return False
-    
-    # Test Microphone
+        return False, f"❌ Speech Recognition failed: {e}"
+
+def _probe_sr_mic():
+    """Open the default microphone"""
     try:
         import speech_recognition as sr
-        mic = sr.Microphone()
-        print("✅ Microphone access available")
+        sr.Microphone()
+        return True, "✅ Microphone access available"
     except Exception as e:
-        print(f"❌ Microphone access failed: {e}")
-        return False
+        return False, f"❌ Microphone access failed: {e}"
+
+def test_voice_system():
+    """Test voice input/output system"""
+    print("\n🎤 Testing Voice System...")
+    print("-" * 40)
+    
+    # The probes are independent and their engine start-up dominates, so they run
+    # side by side in separate processes
+    probes = [_probe_pyttsx3, _probe_sr_recognizer, _probe_sr_mic]
+    try:
+        with ProcessPoolExecutor(max_workers=len(probes)) as executor:
+            futures = [executor.submit(probe) for probe in probes]
+            results = [future.result() for future in futures]
+    except Exception:
+        results = [probe() for probe in probes]
+    
+    # Report in order, stopping at the first failure as before
+    for ok, message in results:
+        print(message)
+        if not ok:
+            return False
     
     return True
 
@@ -132,9 +222,15 @@ def test_system_info():
 
 def main():
     """Run all tests"""
+    parser = argparse.ArgumentParser(description="Verify the CommandEcho installation")
+    parser.add_argument("--force", action="store_true", help="Ignore cached results and re-run every check")
+    args = parser.parse_args()
+    
     print("🤖 CommandEcho Installation Test")
     print("=" * 50)
     
+    _load_check_cache(force=args.force)
+    
     # Run tests
     deps_ok = test_dependencies()
     dirs_ok = test_directories()
@@ -144,6 +240,8 @@ def main():
     # System info
     test_system_info()
     
+    _save_check_cache()
+    
     # Final result
     print("\n" + "=" * 50)
     if deps_ok and dirs_ok and voice_ok:
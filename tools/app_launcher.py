@@ -3,13 +3,23 @@ App Launcher Tools for CommandEcho
 Handles launching and closing applications
 """
 
+import heapq
 import logging
 import subprocess
 import platform
 import psutil
 import os
+import shutil
 from typing import Dict, List, Optional
 
+# Lowercased names of system processes left out of the running apps list
+SYSTEM_PROCESS_NAMES = frozenset([
+    'system', 'system idle process', 'svchost.exe', 'dwm.exe', 'winlogon.exe'
+])
+
+# Number of applications listed by list_running_apps
+RUNNING_APPS_SHOWN = 15
+
 class AppLauncher:
     """Handles application launching and management"""
     
@@ -52,6 +62,16 @@ class AppLauncher:
             'powerpoint': {'windows': 'powerpnt', 'darwin': 'Microsoft PowerPoint'},
         }
         
+        # Executable of each mapped app on this platform
+        self._apps = {
+            name: executables[self.system]
+            for name, executables in self.app_mappings.items()
+            if self.system in executables
+        }
+        
+        # Absolute path of each executable name, or None if it is not on PATH
+        self._resolved: Dict[str, Optional[str]] = {}
+        
         self.logger.info(f"App launcher initialized for {self.system}")
     
     def launch_app(self, app_name: str) -> str:
@@ -60,40 +80,45 @@ class AppLauncher:
         
         try:
             # Check if it's a mapped application
+            executable = self._apps.get(app_name_lower)
+            if executable:
+                return self._launch_executable(executable, app_name)
+            
+            # Mapped, but only for other platforms
             if app_name_lower in self.app_mappings:
-                app_info = self.app_mappings[app_name_lower]
-                
-                if self.system in app_info:
-                    executable = app_info[self.system]
-                    return self._launch_executable(executable, app_name)
-                else:
-                    return f"'{app_name}' is not available on {self.system}"
+                return f"'{app_name}' is not available on {self.system}"
             
             # Try to launch directly by name
-            else:
-                return self._launch_executable(app_name_lower, app_name)
+            return self._launch_executable(app_name_lower, app_name)
                 
         except Exception as e:
             self.logger.error(f"Error launching app {app_name}: {e}")
             return f"Failed to launch {app_name}: {e}"
     
+    def _resolve(self, executable: str) -> Optional[str]:
+        """Find an executable on PATH, searching once per name"""
+        if executable not in self._resolved:
+            self._resolved[executable] = shutil.which(executable)
+        return self._resolved[executable]
+    
     def _launch_executable(self, executable: str, display_name: str) -> str:
         """Launch an executable"""
         try:
             if self.system == "windows":
-                # Try different methods for Windows
-                try:
-                    # First try with shell=True for built-in commands
-                    subprocess.Popen(executable, shell=True)
-                    return f"Launched {display_name}"
-                except:
-                    # Try without shell for regular executables
-                    subprocess.Popen([executable])
+                path = self._resolve(executable)
+                if path:
+                    # Start the resolved program directly, without a cmd.exe in between
+                    subprocess.Popen([path], creationflags=subprocess.DETACHED_PROCESS)
                     return f"Launched {display_name}"
+                
+                # Not on PATH; let the shell try (built-in commands, App Paths entries)
+                subprocess.Popen(executable, shell=True)
+                return f"Launched {display_name}"
             
             elif self.system == "linux":
                 # Use subprocess for Linux
-                subprocess.Popen([executable], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                path = self._resolve(executable) or executable
+                subprocess.Popen([path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
                 return f"Launched {display_name}"
             
             elif self.system == "darwin":  # macOS
@@ -115,18 +140,23 @@ class AppLauncher:
         app_name_lower = app_name.lower().strip()
         
         try:
+            # Names to look for in process names, computed once for the whole scan
+            aliases = tuple({app_name_lower, *self._get_app_aliases(app_name_lower)})
+            
             # Find running processes that match the app name
             matching_processes = []
             
-            for proc in psutil.process_iter(['pid', 'name', 'exe']):
+            for proc in psutil.process_iter(['name']):
                 try:
                     proc_name = proc.info['name'].lower() if proc.info['name'] else ""
-                    proc_exe = proc.info['exe'].lower() if proc.info['exe'] else ""
                     
-                    # Check if the app name matches the process name or executable
-                    if (app_name_lower in proc_name or 
-                        app_name_lower in proc_exe or
-                        any(app_name_lower in alias for alias in self._get_app_aliases(app_name_lower))):
+                    # Check the process name first; the executable path costs an extra lookup
+                    if any(alias in proc_name for alias in aliases):
+                        matching_processes.append(proc)
+                        continue
+                    
+                    proc_exe = proc.exe().lower()
+                    if app_name_lower in proc_exe:
                         matching_processes.append(proc)
                         
                 except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
@@ -158,10 +188,8 @@ class AppLauncher:
         aliases = []
         
         # Check our mappings
-        if app_name in self.app_mappings:
-            app_info = self.app_mappings[app_name]
-            if self.system in app_info:
-                aliases.append(app_info[self.system].lower())
+        if app_name in self._apps:
+            aliases.append(self._apps[app_name].lower())
         
         # Add common variations
         if 'chrome' in app_name:
@@ -178,29 +206,26 @@ class AppLauncher:
     def list_running_apps(self) -> str:
         """List currently running applications"""
         try:
-            running_apps = set()
+            # Only names are fetched; process_iter skips processes that exit
+            # meanwhile and reports None for names it may not read
+            proc_names = (proc.info['name'] for proc in psutil.process_iter(['name']))
             
-            for proc in psutil.process_iter(['pid', 'name']):
-                try:
-                    if proc.info['name']:
-                        # Filter out system processes and focus on user applications
-                        proc_name = proc.info['name']
-                        if not proc_name.startswith(('System', 'svchost', 'dwm', 'winlogon')):
-                            running_apps.add(proc_name)
-                            
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    continue
+            # Filter out system processes and focus on user applications
+            running_apps = {
+                name for name in proc_names
+                if name and name.lower() not in SYSTEM_PROCESS_NAMES
+            }
             
             if running_apps:
-                sorted_apps = sorted(running_apps)
-                result = "Currently running applications:\n"
-                for i, app in enumerate(sorted_apps[:15], 1):  # Limit to 15 apps
-                    result += f"{i}. {app}\n"
+                # Only the first names in sorted order are shown
+                shown_apps = heapq.nsmallest(RUNNING_APPS_SHOWN, running_apps)
+                lines = ["Currently running applications:"]
+                lines.extend(f"{i}. {app}" for i, app in enumerate(shown_apps, 1))
                 
-                if len(sorted_apps) > 15:
-                    result += f"... and {len(sorted_apps) - 15} more applications"
+                if len(running_apps) > RUNNING_APPS_SHOWN:
+                    lines.append(f"... and {len(running_apps) - RUNNING_APPS_SHOWN} more applications")
                 
-                return result.strip()
+                return "\n".join(lines)
             else:
                 return "No user applications currently running"
                 
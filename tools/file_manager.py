@@ -5,9 +5,55 @@ Handles file operations and searches
 
 import logging
 import os
-import glob
+import heapq
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, List, Optional, Union
+
+# Aho-Corasick matches several search terms in one pass over a name (optional)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# TTL cache for repeated searches and listings (optional)
+try:
+    from cachetools import TTLCache
+    CACHETOOLS_AVAILABLE = True
+except ImportError:
+    CACHETOOLS_AVAILABLE = False
+
+# Directories and files shown per directory listing
+LISTING_LIMIT = 10
+
+# Entries and lifetime (seconds) of the search and listing caches
+RESULT_CACHE_SIZE = 128
+RESULT_CACHE_TTL = 60
+
+# Threads walking the search locations; the work is I/O-bound
+SEARCH_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+def _entry_name(entry: os.DirEntry) -> str:
+    """Sort key for directory entries"""
+    return entry.name
+
+def _name_matcher(terms: List[str]) -> Callable[[str], bool]:
+    """Build a predicate telling whether a lowercased file name contains any of the terms"""
+    if len(terms) == 1:
+        term = terms[0]
+        return lambda name: term in name
+    
+    if AHOCORASICK_AVAILABLE and all(terms):
+        automaton = ahocorasick.Automaton()
+        for term in terms:
+            automaton.add_word(term, term)
+        automaton.make_automaton()
+        return lambda name: next(automaton.iter(name), None) is not None
+    
+    return lambda name: any(term in name for term in terms)
 
 class FileManager:
     """Handles file operations and searches"""
@@ -25,42 +71,81 @@ class FileManager:
             Path.home() / "Music"
         ]
         
+        # Recent search results and directory listings, reused for RESULT_CACHE_TTL seconds
+        if CACHETOOLS_AVAILABLE:
+            self._search_cache = TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+            self._listing_cache = TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+        else:
+            self._search_cache = None
+            self._listing_cache = None
+        
         self.logger.info("File manager initialized")
     
-    def search_files(self, search_term: str, max_results: int = 10) -> str:
-        """Search for files containing the search term"""
+    def search_files(self, search_term: Union[str, List[str]], max_results: int = 10) -> str:
+        """Search for files containing the search term (or any of several terms)"""
         try:
             found_files = []
-            search_term_lower = search_term.lower()
+            terms = [search_term] if isinstance(search_term, str) else list(search_term)
+            terms_lower = list(dict.fromkeys(term.lower() for term in terms))
             
-            # Search in common directories
-            for search_path in self.search_paths:
-                if not search_path.exists():
-                    continue
-                
-                try:
-                    # Search for files with matching names
-                    for file_path in search_path.rglob("*"):
-                        if len(found_files) >= max_results:
-                            break
-                        
-                        if file_path.is_file() and search_term_lower in file_path.name.lower():
-                            found_files.append(str(file_path))
-                
-                except PermissionError:
-                    # Skip directories we can't access
-                    continue
-                except Exception as e:
-                    self.logger.error(f"Error searching in {search_path}: {e}")
-                    continue
+            cache_key = (tuple(sorted(terms_lower)), max_results)
+            if self._search_cache is not None and cache_key in self._search_cache:
+                return self._search_cache[cache_key]
+            
+            matches = _name_matcher(terms_lower)
+            search_term = "' or '".join(terms)
+            lock = threading.Lock()
+            done = threading.Event()
+            if max_results <= 0:
+                done.set()  # Nothing to collect, so no location is walked
+            
+            def scan(search_path: Path):
+                """Collect matching files under one search location"""
+                # Breadth-first walk with os.scandir; DirEntry caches the file type
+                # from the directory listing, so no per-entry stat or Path object
+                pending = deque([str(search_path)])
+                while pending and not done.is_set():
+                    directory = pending.popleft()
+                    try:
+                        with os.scandir(directory) as entries:
+                            for entry in entries:
+                                # Stop mid-listing as soon as any worker has filled the results
+                                if done.is_set():
+                                    break
+                                if entry.is_dir(follow_symlinks=False):
+                                    pending.append(entry.path)
+                                elif matches(entry.name.lower()) and entry.is_file(follow_symlinks=False):
+                                    with lock:
+                                        if len(found_files) < max_results:
+                                            found_files.append(entry.path)
+                                        if len(found_files) >= max_results:
+                                            done.set()
+                    
+                    except PermissionError:
+                        # Skip directories we can't access
+                        continue
+                    except Exception as e:
+                        self.logger.error(f"Error searching in {directory}: {e}")
+                        continue
+            
+            # Search the common directories concurrently; the walk is dominated by
+            # directory reads and stats, which release the GIL
+            search_paths = [path for path in self.search_paths if path.exists()]
+            if search_paths:
+                workers = min(SEARCH_WORKERS, len(search_paths))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    list(executor.map(scan, search_paths))
             
             if found_files:
-                result = f"Found {len(found_files)} files matching '{search_term}':\n"
-                for i, file_path in enumerate(found_files[:max_results], 1):
-                    result += f"{i}. {file_path}\n"
-                return result.strip()
+                lines = [f"Found {len(found_files)} files matching '{search_term}':"]
+                lines.extend(f"{i}. {file_path}" for i, file_path in enumerate(found_files[:max_results], 1))
+                result = "\n".join(lines)
             else:
-                return f"No files found matching '{search_term}'"
+                result = f"No files found matching '{search_term}'"
+            
+            if self._search_cache is not None:
+                self._search_cache[cache_key] = result
+            return result
                 
         except Exception as e:
             self.logger.error(f"Error searching files: {e}")
@@ -88,10 +173,16 @@ class FileManager:
                        f"Modified: {modified_date}")
             
             elif path.is_dir():
-                # Count files in directory
+                # Count files in directory in one pass; DirEntry caches the file type
                 try:
-                    file_count = len([f for f in path.iterdir() if f.is_file()])
-                    dir_count = len([f for f in path.iterdir() if f.is_dir()])
+                    file_count = 0
+                    dir_count = 0
+                    with os.scandir(path) as entries:
+                        for entry in entries:
+                            if entry.is_file():
+                                file_count += 1
+                            elif entry.is_dir():
+                                dir_count += 1
                     
                     return (f"Directory: {path.name}\n"
                            f"Location: {path.parent}\n"
@@ -109,6 +200,9 @@ class FileManager:
             if directory_path is None:
                 directory_path = str(Path.home())
             
+            if self._listing_cache is not None and directory_path in self._listing_cache:
+                return self._listing_cache[directory_path]
+            
             path = Path(directory_path)
             
             if not path.exists():
@@ -118,36 +212,50 @@ class FileManager:
                 return f"Not a directory: {directory_path}"
             
             try:
-                items = list(path.iterdir())
+                with os.scandir(path) as entries:
+                    items = list(entries)
                 
                 if not items:
                     return f"Directory is empty: {directory_path}"
                 
-                # Separate files and directories
-                directories = [item for item in items if item.is_dir()]
-                files = [item for item in items if item.is_file()]
+                # Separate files and directories in one pass over the cached entry types
+                directories = []
+                files = []
+                for item in items:
+                    if item.is_dir():
+                        directories.append(item)
+                    elif item.is_file():
+                        files.append(item)
                 
-                result = f"Contents of {directory_path}:\n\n"
+                sections = [f"Contents of {directory_path}:"]
                 
                 if directories:
-                    result += "Directories:\n"
-                    for directory in sorted(directories)[:10]:  # Limit to 10
-                        result += f"  📁 {directory.name}\n"
+                    lines = ["Directories:"]
+                    lines.extend(
+                        f"  📁 {directory.name}"
+                        for directory in heapq.nsmallest(LISTING_LIMIT, directories, key=_entry_name)
+                    )
                     
-                    if len(directories) > 10:
-                        result += f"  ... and {len(directories) - 10} more directories\n"
-                    result += "\n"
+                    if len(directories) > LISTING_LIMIT:
+                        lines.append(f"  ... and {len(directories) - LISTING_LIMIT} more directories")
+                    sections.append("\n".join(lines))
                 
                 if files:
-                    result += "Files:\n"
-                    for file in sorted(files)[:10]:  # Limit to 10
+                    lines = ["Files:"]
+                    # Only the entries shown are stat'ed for their size
+                    for file in heapq.nsmallest(LISTING_LIMIT, files, key=_entry_name):
                         size_kb = file.stat().st_size / 1024
-                        result += f"  📄 {file.name} ({size_kb:.1f} KB)\n"
+                        lines.append(f"  📄 {file.name} ({size_kb:.1f} KB)")
                     
-                    if len(files) > 10:
-                        result += f"  ... and {len(files) - 10} more files\n"
+                    if len(files) > LISTING_LIMIT:
+                        lines.append(f"  ... and {len(files) - LISTING_LIMIT} more files")
+                    sections.append("\n".join(lines))
                 
-                return result.strip()
+                # Sections are separated by a blank line
+                result = "\n\n".join(sections)
+                if self._listing_cache is not None:
+                    self._listing_cache[directory_path] = result
+                return result
                 
             except PermissionError:
                 return f"Access denied to directory: {directory_path}"
@@ -156,11 +264,18 @@ class FileManager:
             self.logger.error(f"Error listing directory: {e}")
             return f"Error listing directory: {e}"
     
+    def _clear_caches(self):
+        """Drop cached searches and listings after the file system is changed"""
+        if self._search_cache is not None:
+            self._search_cache.clear()
+            self._listing_cache.clear()
+    
     def create_directory(self, directory_path: str) -> str:
         """Create a new directory"""
         try:
             path = Path(directory_path)
             path.mkdir(parents=True, exist_ok=True)
+            self._clear_caches()
             return f"Directory created: {directory_path}"
             
         except Exception as e:
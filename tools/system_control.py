@@ -3,12 +3,62 @@ System Control Tools for CommandEcho
 Handles system-level operations like volume, brightness, battery info
 """
 
+import asyncio
 import logging
 import platform
+import re
 import subprocess
 import psutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+
+from utils.helpers import static_system_info, ttl_cache
+
+# Partitions whose usage is read concurrently; a slow mount then only delays its own line
+STORAGE_WORKERS = 8
+
+# Seconds psutil readings are reused; repeat questions (or tool calls) in a burst share one reading
+PSUTIL_TTL = 2.0
+
+@ttl_cache(PSUTIL_TTL)
+def _battery_raw():
+    """Battery status, reused for PSUTIL_TTL seconds"""
+    return psutil.sensors_battery()
+
+@ttl_cache(PSUTIL_TTL)
+def _partitions_raw():
+    """Mounted partitions, reused for PSUTIL_TTL seconds"""
+    return psutil.disk_partitions()
+
+@ttl_cache(PSUTIL_TTL)
+def _disk_usage_raw(mountpoint: str):
+    """Usage of one mounted partition, reused for PSUTIL_TTL seconds"""
+    return psutil.disk_usage(mountpoint)
+
+@ttl_cache(PSUTIL_TTL)
+def _vmem_raw():
+    """Virtual memory statistics, reused for PSUTIL_TTL seconds"""
+    return psutil.virtual_memory()
+
+# amixer query for the current master volume, and the percentage in its output
+GET_VOLUME_COMMAND = ["amixer", "get", "Master"]
+_VOLUME_RE = re.compile(r'\[(\d+)%\]')
+
+def _parse_volume(output: str) -> Optional[int]:
+    """Volume percentage from amixer output"""
+    match = _VOLUME_RE.search(output)
+    return int(match.group(1)) if match else None
+
+async def _run_async(command: List[str]) -> bytes:
+    """Run a command without blocking the event loop; raises CalledProcessError like subprocess.run(check=True)"""
+    proc = await asyncio.create_subprocess_exec(
+        *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, command, stdout, stderr)
+    return stdout
 
 class SystemControl:
     """Handles system control operations"""
@@ -18,35 +68,59 @@ class SystemControl:
         self.system = platform.system().lower()
         self.logger.info(f"System control initialized for {self.system}")
     
+    def _volume_command(self, volume: int) -> Optional[List[str]]:
+        """Command line that sets the volume on this system, or None if unsupported"""
+        if self.system == "windows":
+            # Use nircmd for Windows volume control
+            return ["nircmd.exe", "setsysvolume", str(int(volume * 655.35))]
+        elif self.system == "linux":
+            # Use amixer for Linux
+            return ["amixer", "set", "Master", f"{volume}%"]
+        elif self.system == "darwin":  # macOS
+            # Use osascript for macOS
+            return ["osascript", "-e", f"set volume output volume {volume}"]
+        return None
+    
+    def _brightness_command(self, brightness: int) -> Optional[List[str]]:
+        """Command line that sets the brightness on this system, or None if unsupported"""
+        if self.system == "windows":
+            # Use powershell for Windows brightness control
+            ps_command = f"(Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightnessMethods).WmiSetBrightness(1,{brightness})"
+            return ["powershell", "-Command", ps_command]
+        elif self.system == "linux":
+            # Use xrandr for Linux (requires X11)
+            brightness_decimal = brightness / 100.0
+            return ["xrandr", "--output", "eDP-1", "--brightness", str(brightness_decimal)]
+        return None
+    
     def set_volume(self, volume: int) -> str:
         """Set system volume (0-100)"""
         volume = max(0, min(100, volume))  # Clamp between 0-100
         
+        command = self._volume_command(volume)
+        if command is None:
+            return "Volume control not supported on this system"
+        
         try:
-            if self.system == "windows":
-                # Use nircmd for Windows volume control
-                subprocess.run([
-                    "nircmd.exe", "setsysvolume", str(int(volume * 655.35))
-                ], check=True, capture_output=True)
-                return f"Volume set to {volume}%"
-            
-            elif self.system == "linux":
-                # Use amixer for Linux
-                subprocess.run([
-                    "amixer", "set", "Master", f"{volume}%"
-                ], check=True, capture_output=True)
-                return f"Volume set to {volume}%"
-            
-            elif self.system == "darwin":  # macOS
-                # Use osascript for macOS
-                subprocess.run([
-                    "osascript", "-e", f"set volume output volume {volume}"
-                ], check=True, capture_output=True)
-                return f"Volume set to {volume}%"
-            
-            else:
-                return "Volume control not supported on this system"
-                
+            subprocess.run(command, check=True, capture_output=True)
+            return f"Volume set to {volume}%"
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"Error setting volume: {e}")
+            return f"Failed to set volume. Error: {e}"
+        except FileNotFoundError:
+            return "Volume control utility not found. Please install required tools."
+    
+    async def set_volume_async(self, volume: int) -> str:
+        """Set system volume (0-100) without blocking the event loop"""
+        volume = max(0, min(100, volume))  # Clamp between 0-100
+        
+        command = self._volume_command(volume)
+        if command is None:
+            return "Volume control not supported on this system"
+        
+        try:
+            await _run_async(command)
+            return f"Volume set to {volume}%"
         except subprocess.CalledProcessError as e:
             self.logger.error(f"Error setting volume: {e}")
             return f"Failed to set volume. Error: {e}"
@@ -65,6 +139,17 @@ class SystemControl:
         except Exception as e:
             return f"Error adjusting volume: {e}"
     
+    async def adjust_volume_async(self, change: int) -> str:
+        """Adjust volume by a relative amount without blocking the event loop"""
+        try:
+            current_volume = await self.get_current_volume_async()
+            if current_volume is not None:
+                return await self.set_volume_async(current_volume + change)
+            else:
+                return "Could not determine current volume"
+        except Exception as e:
+            return f"Error adjusting volume: {e}"
+    
     def get_current_volume(self) -> Optional[int]:
         """Get current system volume"""
         try:
@@ -73,15 +158,8 @@ class SystemControl:
                 return 50  # Placeholder
             
             elif self.system == "linux":
-                result = subprocess.run([
-                    "amixer", "get", "Master"
-                ], capture_output=True, text=True, check=True)
-                
-                # Parse amixer output to get volume percentage
-                import re
-                match = re.search(r'\[(\d+)%\]', result.stdout)
-                if match:
-                    return int(match.group(1))
+                result = subprocess.run(GET_VOLUME_COMMAND, capture_output=True, text=True, check=True)
+                return _parse_volume(result.stdout)
             
             return None
             
@@ -89,30 +167,50 @@ class SystemControl:
             self.logger.error(f"Error getting current volume: {e}")
             return None
     
-    def set_brightness(self, brightness: int) -> str:
-        """Set screen brightness (0-100)"""
-        brightness = max(0, min(100, brightness))
-        
+    async def get_current_volume_async(self) -> Optional[int]:
+        """Get current system volume without blocking the event loop"""
         try:
             if self.system == "windows":
-                # Use powershell for Windows brightness control
-                ps_command = f"(Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightnessMethods).WmiSetBrightness(1,{brightness})"
-                subprocess.run([
-                    "powershell", "-Command", ps_command
-                ], check=True, capture_output=True)
-                return f"Brightness set to {brightness}%"
+                return 50  # Placeholder, as in get_current_volume
             
             elif self.system == "linux":
-                # Use xrandr for Linux (requires X11)
-                brightness_decimal = brightness / 100.0
-                subprocess.run([
-                    "xrandr", "--output", "eDP-1", "--brightness", str(brightness_decimal)
-                ], check=True, capture_output=True)
-                return f"Brightness set to {brightness}%"
+                stdout = await _run_async(GET_VOLUME_COMMAND)
+                return _parse_volume(stdout.decode(errors='replace'))
             
-            else:
-                return "Brightness control not implemented for this system"
-                
+            return None
+            
+        except Exception as e:
+            self.logger.error(f"Error getting current volume: {e}")
+            return None
+    
+    def set_brightness(self, brightness: int) -> str:
+        """Set screen brightness (0-100)"""
+        brightness = max(0, min(100, brightness))
+        
+        command = self._brightness_command(brightness)
+        if command is None:
+            return "Brightness control not implemented for this system"
+        
+        try:
+            subprocess.run(command, check=True, capture_output=True)
+            return f"Brightness set to {brightness}%"
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"Error setting brightness: {e}")
+            return f"Failed to set brightness. Error: {e}"
+        except FileNotFoundError:
+            return "Brightness control utility not found"
+    
+    async def set_brightness_async(self, brightness: int) -> str:
+        """Set screen brightness (0-100) without blocking the event loop"""
+        brightness = max(0, min(100, brightness))
+        
+        command = self._brightness_command(brightness)
+        if command is None:
+            return "Brightness control not implemented for this system"
+        
+        try:
+            await _run_async(command)
+            return f"Brightness set to {brightness}%"
         except subprocess.CalledProcessError as e:
             self.logger.error(f"Error setting brightness: {e}")
             return f"Failed to set brightness. Error: {e}"
@@ -122,7 +220,7 @@ class SystemControl:
     def get_battery_info(self) -> str:
         """Get battery information"""
         try:
-            battery = psutil.sensors_battery()
+            battery = _battery_raw()
             if battery is None:
                 return "No battery found or battery information unavailable"
             
@@ -151,20 +249,20 @@ class SystemControl:
     def get_system_info(self) -> str:
         """Get general system information"""
         try:
-            # Get basic system info
+            # Get basic system info (looked up once per process)
+            static = static_system_info()
             system_info = []
-            system_info.append(f"System: {platform.system()} {platform.release()}")
-            system_info.append(f"Processor: {platform.processor()}")
+            system_info.append(f"System: {static['platform']} {static['platform_release']}")
+            system_info.append(f"Processor: {static['processor']}")
             
             # Memory info
-            memory = psutil.virtual_memory()
-            memory_gb = memory.total / (1024**3)
-            memory_used_percent = memory.percent
+            memory_gb = static['memory_total'] / (1024**3)
+            memory_used_percent = _vmem_raw().percent
             system_info.append(f"Memory: {memory_gb:.1f}GB total, {memory_used_percent}% used")
             
             # CPU info
             cpu_percent = psutil.cpu_percent(interval=1)
-            cpu_count = psutil.cpu_count()
+            cpu_count = static['cpu_count']
             system_info.append(f"CPU: {cpu_count} cores, {cpu_percent}% usage")
             
             return "\n".join(system_info)
@@ -173,29 +271,35 @@ class SystemControl:
             self.logger.error(f"Error getting system info: {e}")
             return f"Error retrieving system information: {e}"
     
+    def _usage_for(self, partition) -> Optional[str]:
+        """Format the usage of one partition, or None if it cannot be read"""
+        try:
+            usage = _disk_usage_raw(partition.mountpoint)
+        except OSError:
+            # Skip drives we can't access, including empty removable drives
+            return None
+        
+        total_gb = usage.total / (1024**3)
+        used_gb = usage.used / (1024**3)
+        free_gb = usage.free / (1024**3)
+        percent_used = (usage.used / usage.total) * 100 if usage.total else 0.0
+        
+        return (
+            f"Drive {partition.device}: {used_gb:.1f}GB used / {total_gb:.1f}GB total "
+            f"({percent_used:.1f}% used, {free_gb:.1f}GB free)"
+        )
+    
     def get_storage_info(self) -> str:
         """Get storage information"""
         try:
-            storage_info = []
-            
             # Get disk usage for all mounted drives
-            partitions = psutil.disk_partitions()
-            
-            for partition in partitions:
-                try:
-                    usage = psutil.disk_usage(partition.mountpoint)
-                    total_gb = usage.total / (1024**3)
-                    used_gb = usage.used / (1024**3)
-                    free_gb = usage.free / (1024**3)
-                    percent_used = (usage.used / usage.total) * 100
-                    
-                    storage_info.append(
-                        f"Drive {partition.device}: {used_gb:.1f}GB used / {total_gb:.1f}GB total "
-                        f"({percent_used:.1f}% used, {free_gb:.1f}GB free)"
-                    )
-                except PermissionError:
-                    # Skip drives we can't access
-                    continue
+            partitions = _partitions_raw()
+            if not partitions:
+                return "No storage information available"
+            
+            # statfs calls block per device, so run them side by side
+            with ThreadPoolExecutor(max_workers=min(len(partitions), STORAGE_WORKERS)) as executor:
+                storage_info = [line for line in executor.map(self._usage_for, partitions) if line]
             
             return "\n".join(storage_info) if storage_info else "No storage information available"
             
@@ -2,12 +2,56 @@
 Helper functions for CommandEcho
 """
 
+import functools
 import os
+import shutil
+import stat
 import sys
 import logging
+import re
+import time
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
+# Seconds the system information summary is reused
+SYSTEM_INFO_TTL = 60.0
+
+# Markup and URL patterns stripped before speech synthesis
+_BOLD_RE = re.compile(r'\*\*(.*?)\*\*')
+_ITALIC_RE = re.compile(r'\*(.*?)\*')
+_CODE_RE = re.compile(r'`(.*?)`')
+_URL_RE = re.compile(r'https?://\S+')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# First bytes of every GGUF model file
+GGUF_MAGIC = b'GGUF'
+
+# Voices found by get_available_voices, None until enumeration succeeds
+_voices: Optional[List[Dict[str, Any]]] = None
+
+# Units used by format_file_size, 1024 apart
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
+def ttl_cache(ttl: float):
+    """Cache a function's results per argument tuple for ttl seconds"""
+    def decorator(fn):
+        cache = {}
+        
+        @functools.wraps(fn)
+        def wrapper(*args):
+            now = time.monotonic()
+            entry = cache.get(args)
+            if entry is not None and now - entry[0] < ttl:
+                return entry[1]
+            
+            result = fn(*args)
+            cache[args] = (now, result)
+            return result
+        
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
 def setup_logging(log_level: str = "INFO", log_file: str = "commandecho.log"):
     """Setup logging configuration"""
     level = getattr(logging, log_level.upper(), logging.INFO)
@@ -23,6 +67,11 @@ def setup_logging(log_level: str = "INFO", log_file: str = "commandecho.log"):
             logging.StreamHandler(sys.stdout)
         ]
     )
+    
+    # The format uses none of the thread/process fields, so skip collecting them per record
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
 
 def check_dependencies() -> Dict[str, bool]:
     """Check if all required dependencies are available"""
@@ -52,90 +101,153 @@ def check_dependencies() -> Dict[str, bool]:
     
     return dependencies
 
-def get_system_info() -> Dict[str, Any]:
-    """Get basic system information"""
+def _memory_total() -> int:
+    """Total physical memory in bytes"""
+    # On Linux the first line of /proc/meminfo is "MemTotal: <n> kB"
+    try:
+        with open('/proc/meminfo') as f:
+            return int(f.readline().split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        import psutil
+        return psutil.virtual_memory().total
+
+def _cpu_model() -> str:
+    """CPU model name"""
+    import platform
+    
+    # platform.processor() is often empty on Linux and may shell out to uname
+    if sys.platform.startswith('linux'):
+        try:
+            with open('/proc/cpuinfo') as f:
+                for line in f:
+                    if line.startswith('model name'):
+                        return line.split(':', 1)[1].strip()
+        except OSError:
+            pass
+    return platform.processor() or platform.machine()
+
+@functools.lru_cache(maxsize=1)
+def static_system_info() -> Dict[str, Any]:
+    """Platform, CPU and memory facts that do not change while the process runs"""
     import platform
-    import psutil
     
     return {
         'platform': platform.system(),
+        'platform_release': platform.release(),
         'platform_version': platform.version(),
         'architecture': platform.architecture()[0],
-        'processor': platform.processor(),
+        'processor': _cpu_model(),
         'python_version': platform.python_version(),
-        'cpu_count': psutil.cpu_count(),
-        'memory_total': psutil.virtual_memory().total,
-        'disk_usage': psutil.disk_usage('/').total if os.name != 'nt' else psutil.disk_usage('C:').total
+        'cpu_count': os.cpu_count(),
+        'memory_total': _memory_total()
+    }
+
+@ttl_cache(SYSTEM_INFO_TTL)
+def get_system_info() -> Dict[str, Any]:
+    """Get basic system information"""
+    return {
+        **static_system_info(),
+        'disk_usage': shutil.disk_usage('/' if os.name != 'nt' else 'C:\\').total
     }
 
+def existing_directories(directories: List[str]) -> set:
+    """Return which of the given relative directories exist, listing each parent directory once"""
+    by_parent: Dict[str, List[str]] = {}
+    for directory in directories:
+        parent, _, name = directory.rstrip('/').rpartition('/')
+        by_parent.setdefault(parent, []).append(name)
+    
+    existing = set()
+    for parent, names in by_parent.items():
+        try:
+            with os.scandir(parent or '.') as entries:
+                present = {entry.name for entry in entries if entry.is_dir()}
+        except OSError:
+            continue  # Parent missing, so none of its children exist
+        
+        prefix = f"{parent}/" if parent else ""
+        existing.update(prefix + name for name in names if name in present)
+    
+    return existing
+
 def format_file_size(size_bytes: int) -> str:
     """Format file size in human readable format"""
-    if size_bytes == 0:
+    if size_bytes <= 0:
         return "0 B"
     
-    size_names = ["B", "KB", "MB", "GB", "TB"]
-    import math
-    i = int(math.floor(math.log(size_bytes, 1024)))
-    p = math.pow(1024, i)
-    s = round(size_bytes / p, 2)
-    return f"{s} {size_names[i]}"
+    # Each unit is 2**10 of the previous one, so the bit length picks the unit
+    i = min((size_bytes.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+    s = round(size_bytes / (1 << (i * 10)), 2)
+    return f"{s} {SIZE_UNITS[i]}"
+
+@functools.lru_cache(maxsize=32)
+def _model_header_valid(model_path: str, mtime_ns: int, size: int) -> bool:
+    """Check a model file's header; cached per path, mtime and size"""
+    try:
+        with open(model_path, 'rb') as f:
+            header = f.read(4)
+    except (IOError, OSError):
+        return False
+    
+    # GGUF files start with a magic number; older .bin formats vary, so only require a header
+    if model_path.lower().endswith('.gguf'):
+        return header == GGUF_MAGIC
+    return len(header) == 4
 
 def validate_model_file(model_path: str) -> bool:
     """Validate if model file exists and is accessible"""
     path = Path(model_path)
     
-    if not path.exists():
-        return False
-    
-    if not path.is_file():
-        return False
-    
     # Check if it's a GGUF file
     if not path.suffix.lower() in ['.gguf', '.bin']:
         return False
     
-    # Check if file is readable
+    # A single stat covers both the existence and the regular-file check
     try:
-        with open(path, 'rb') as f:
-            # Read first few bytes to check if it's a valid file
-            header = f.read(4)
-            return len(header) == 4
-    except (IOError, OSError):
+        st = path.stat()
+    except OSError:
+        return False
+    
+    if not stat.S_ISREG(st.st_mode):
         return False
+    
+    return _model_header_valid(str(path), st.st_mtime_ns, st.st_size)
 
 def clean_text_for_speech(text: str) -> str:
     """Clean text for better speech synthesis"""
-    import re
-    
     # Remove markdown formatting
-    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)  # Bold
-    text = re.sub(r'\*(.*?)\*', r'\1', text)      # Italic
-    text = re.sub(r'`(.*?)`', r'\1', text)        # Code
+    text = _BOLD_RE.sub(r'\1', text)
+    text = _ITALIC_RE.sub(r'\1', text)
+    text = _CODE_RE.sub(r'\1', text)
     
     # Remove URLs
-    text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\$$\$$,]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', 'link', text)
+    text = _URL_RE.sub('link', text)
     
     # Clean up extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    return text
+    return _WHITESPACE_RE.sub(' ', text).strip()
 
-def get_available_voices():
-    """Get list of available TTS voices"""
-    try:
-        import pyttsx3
-        engine = pyttsx3.init()
-        voices = engine.getProperty('voices')
-        
-        voice_list = []
-        for i, voice in enumerate(voices):
-            voice_list.append({
-                'id': i,
-                'name': voice.name,
-                'language': getattr(voice, 'languages', ['unknown'])[0] if hasattr(voice, 'languages') else 'unknown'
-            })
-        
-        engine.stop()
-        return voice_list
-    except Exception:
-        return []
+def get_available_voices() -> List[Dict[str, Any]]:
+    """Get list of available TTS voices (enumerated once they are found)"""
+    global _voices
+    if _voices is None:
+        try:
+            import pyttsx3
+            engine = pyttsx3.init()
+            voices = engine.getProperty('voices')
+            
+            voice_list = []
+            for i, voice in enumerate(voices):
+                voice_list.append({
+                    'id': i,
+                    'name': voice.name,
+                    'language': getattr(voice, 'languages', ['unknown'])[0] if hasattr(voice, 'languages') else 'unknown'
+                })
+            
+            engine.stop()
+            _voices = voice_list
+        except Exception:
+            # Not cached, so a later call can retry once the engine works
+            return []
+    
+    # Copies, so callers cannot change the cached entries
+    return [dict(voice) for voice in _voices]
@@ -5,28 +5,75 @@ import queue
 import sounddevice as sd
 import vosk
 import json
+from collections import deque
+
+SAMPLE_RATE = 16000
+BLOCK_SIZE = 8000  # Frames per audio callback
+# Reusable int16 block buffers, so the audio callback does not allocate
+BUFFER_POOL_SIZE = 8
+
+# Loaded Vosk models by path, shared by every listener in the process
+_MODELS = {}
 
 class VoiceListener:
     def __init__(self, model_path="models/vosk-model-small-en-us-0.15"):
-        print("🎙️ Loading Vosk model...")
-        if not os.path.exists(model_path):
-            raise FileNotFoundError("Vosk model not found. Please check your path.")
-        self.model = vosk.Model(model_path)
+        self.model = _MODELS.get(model_path)
+        if self.model is None:
+            print("🎙️ Loading Vosk model...")
+            if not os.path.exists(model_path):
+                raise FileNotFoundError("Vosk model not found. Please check your path.")
+            self.model = _MODELS.setdefault(model_path, vosk.Model(model_path))
         self.q = queue.Queue()
+        self._free = deque(bytearray(BLOCK_SIZE * 2) for _ in range(BUFFER_POOL_SIZE))
 
     def listen(self):
+        # Block until a full utterance has been recognized
+        for kind, text in self.listen_stream():
+            if kind == "final":
+                return text
+
+    def listen_stream(self):
+        # Yield ("partial", text) whenever the running hypothesis changes, then ("final", text)
+        free = self._free
+
         def callback(indata, frames, time, status):
             if status:
                 print("⚠️ Status:", status)
-            self.q.put(bytes(indata))
+            # Copy into a pooled buffer; fall back to a new one if the consumer is behind
+            if free and len(indata) == BLOCK_SIZE * 2:
+                buf = free.pop()
+                buf[:] = indata
+                self.q.put(buf)
+            else:
+                self.q.put(bytes(indata))
+
+        # Drop audio left over from the previous call; it predates the reply that was just spoken
+        while True:
+            try:
+                stale = self.q.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(stale, bytearray):
+                free.append(stale)
 
-        with sd.RawInputStream(samplerate=16000, blocksize=8000, dtype='int16',
+        with sd.RawInputStream(samplerate=SAMPLE_RATE, blocksize=BLOCK_SIZE, dtype='int16',
                                channels=1, callback=callback):
             print("🎤 Listening (Vosk)... Say something!")
-            rec = vosk.KaldiRecognizer(self.model, 16000)
+            rec = vosk.KaldiRecognizer(self.model, SAMPLE_RATE)
+            partial = ""
 
             while True:
                 data = self.q.get()
+                if isinstance(data, bytearray):
+                    # Vosk's cffi binding only accepts bytes; copy here, off the audio thread
+                    buf, data = data, bytes(data)
+                    free.append(buf)  # Hand the buffer back to the callback
                 if rec.AcceptWaveform(data):
                     result = json.loads(rec.Result())
-                    return result.get("text", "")
+                    yield "final", result.get("text", "")
+                    return
+
+                text = json.loads(rec.PartialResult()).get("partial", "")
+                if text != partial:
+                    partial = text
+                    yield "partial", text
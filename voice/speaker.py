@@ -1,22 +1,61 @@
 # voice/speaker.py
 
-import os
-import uuid
-import pygame
+import re
+import threading
+import numpy as np
+import sounddevice as sd
 from TTS.api import TTS
 
+TTS_MODEL = "tts_models/en/ljspeech/tacotron2-DDC"
+
+# Replies are synthesized sentence by sentence so the next one renders while the current one plays
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Loaded TTS models by name, shared by every speaker in the process
+_MODELS = {}
+
 class VoiceSpeaker:
-    def __init__(self):
-        print("🗣️ Loading Coqui TTS...")
-        self.tts = TTS(model_name="tts_models/en/ljspeech/tacotron2-DDC", progress_bar=False, gpu=False)
-        pygame.mixer.init()
-
-    def speak(self, text):
-        file_path = f"temp_{uuid.uuid4()}.wav"
-        self.tts.tts_to_file(text=text, file_path=file_path)
-        pygame.mixer.music.load(file_path)
-        pygame.mixer.music.play()
-        while pygame.mixer.music.get_busy():
-            continue
-        pygame.mixer.music.unload()
-        os.remove(file_path)
+    def __init__(self, model_name=TTS_MODEL):
+        self.tts = _MODELS.get(model_name)
+        if self.tts is None:
+            print("🗣️ Loading Coqui TTS...")
+            self.tts = _MODELS.setdefault(model_name, TTS(model_name=model_name, progress_bar=False, gpu=False))
+        self.sample_rate = self.tts.synthesizer.output_sample_rate
+        # stop() bumps the generation; a reply queued under an older one is skipped,
+        # so a stop is never lost between replies
+        self.generation = 0
+        # Set while a reply is playing
+        self.speaking = threading.Event()
+
+    def _synthesize(self, sentence):
+        return np.asarray(self.tts.tts(text=sentence), dtype=np.float32)
+
+    def speak(self, text, generation=None):
+        # Pass the generation read when the reply was queued; None means "now"
+        if generation is None:
+            generation = self.generation
+        sentences = [sentence for sentence in _SENTENCE_RE.split(text.strip()) if sentence]
+        if not sentences:
+            return
+
+        # Play each sentence straight from memory and render the next one meanwhile
+        self.speaking.set()
+        try:
+            wav = self._synthesize(sentences[0])
+            for i in range(len(sentences)):
+                if generation != self.generation:
+                    break
+                sd.play(wav, self.sample_rate)
+                if generation != self.generation:
+                    sd.stop()  # stop() came in just before play() started
+                    break
+                wav = self._synthesize(sentences[i + 1]) if i + 1 < len(sentences) else None
+                # stop() calls sd.stop(), which ends this wait early
+                sd.wait()
+        finally:
+            self.speaking.clear()
+
+    def stop(self):
+        # Cut off the reply currently being spoken, and any queued before this call
+        self.generation += 1
+        sd.stop()